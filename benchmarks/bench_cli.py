@@ -0,0 +1,58 @@
+"""
+Tracks startup time and peak memory of the showstats command line tool.
+
+Run from the repository root: python benchmarks/bench_cli.py
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append("tests/")
+from conftest import sample_df_  # noqa: E402
+
+ENV = {**os.environ, "PYTHONPATH": "src"}
+
+
+def run(args, repeat: int = 5):
+    """Returns the best wall time and the peak RSS in MB of the child process"""
+    timings = []
+    max_rss = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.Popen(
+            [sys.executable, "-m", "showstats", *args],
+            env=ENV,
+            stdout=subprocess.DEVNULL,
+        )
+        _, status, rusage = os.wait4(proc.pid, 0)
+        timings.append(time.perf_counter() - start)
+        assert os.waitstatus_to_exitcode(status) == 0
+        max_rss = max(max_rss, rusage.ru_maxrss / 1024)  # KB on linux
+
+    return min(timings), max_rss
+
+
+def main():
+    seconds, _ = run(["--help"])
+    print(f"startup (--help)     {seconds:8.3f}s")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        df = sample_df_(1_000_000)
+        for suffix in ("parquet", "arrow", "csv"):
+            path = os.path.join(tmp_dir, f"df.{suffix}")
+            if suffix == "parquet":
+                df.write_parquet(path)
+            elif suffix == "arrow":
+                df.write_ipc(path)
+            else:
+                df.drop("categorical_col", "enum_col").write_csv(path)
+            seconds, max_rss = run([path], repeat=3)
+            print(f"{suffix:<8} 1e6 rows    {seconds:8.3f}s  peak RSS {max_rss:.0f}MB")
+            seconds, max_rss = run([path, "--approx", "--sample", "10000"], repeat=3)
+            print(f"{suffix:<8} sampled     {seconds:8.3f}s  peak RSS {max_rss:.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
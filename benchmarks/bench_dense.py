@@ -0,0 +1,43 @@
+"""
+Compares the numpy backend with the expression path on a wide float frame.
+
+Run from the repository root: python benchmarks/bench_dense.py
+"""
+
+import sys
+import timeit
+
+import numpy as np
+import polars as pl
+
+sys.path.append("src/")
+from showstats._table import _Table  # noqa: E402
+
+
+def make_wide_df(n_rows: int, n_cols: int, seed: int = 1) -> pl.DataFrame:
+    rng = np.random.default_rng(seed)
+    arr = np.asfortranarray(rng.normal(size=(n_rows, n_cols)))
+    return pl.DataFrame(arr, schema=[f"x_{i}" for i in range(n_cols)])
+
+
+def main():
+    for n_rows, n_cols in (
+        (100, 10_000),
+        (500, 5_000),
+        (1_000, 5_000),
+        (10_000, 2_000),
+        (1_000_000, 100),
+    ):
+        df = make_wide_df(n_rows, n_cols)
+        print(f"{n_rows:>9,} x {n_cols:>5,}")
+        for backend in ("polars", "numpy"):
+            seconds = min(
+                timeit.repeat(
+                    lambda: _Table(df, "num", backend=backend), number=1, repeat=3
+                )
+            )
+            print(f"    {backend:<8}{seconds:8.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Profiles many small frames of the same schema, with and without the plan cache.
+
+Run from the repository root: python benchmarks/bench_plan_cache.py
+"""
+
+import sys
+import timeit
+
+import numpy as np
+import polars as pl
+
+sys.path.append("src/")
+from showstats._table import _make_plan, _Table, plan_cache_info  # noqa: E402
+
+
+def make_batches(n_batches: int, n_rows: int, n_cols: int, seed: int = 1):
+    rng = np.random.default_rng(seed)
+    batches = []
+    for _ in range(n_batches):
+        data = {f"x_{i}": rng.normal(size=n_rows) for i in range(n_cols)}
+        data.update({f"s_{i}": rng.choice(["a", "b", "c"], n_rows) for i in range(4)})
+        batches.append(pl.DataFrame(data))
+    return batches
+
+
+def profile_all(batches, cached: bool):
+    for df in batches:
+        if not cached:
+            _make_plan.cache_clear()
+        _Table(df, "all")
+
+
+def main():
+    for n_batches, n_rows, n_cols in ((1_000, 100, 20), (200, 1_000, 200)):
+        batches = make_batches(n_batches, n_rows, n_cols)
+        print(f"{n_batches:>5,} frames of {n_rows:>5,} x {n_cols + 4:>3}")
+        for cached in (False, True):
+            _make_plan.cache_clear()
+            seconds = min(
+                timeit.repeat(lambda: profile_all(batches, cached), number=1, repeat=3)
+            )
+            info = plan_cache_info()
+            label = "cached" if cached else "uncached"
+            print(
+                f"    {label:<9}{seconds:8.3f}s"
+                f"  hits {info.hits:>5}  misses {info.misses:>5}"
+            )
+
+
+if __name__ == "__main__":
+    main()
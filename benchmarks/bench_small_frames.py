@@ -0,0 +1,49 @@
+"""
+Latency percentiles of make_stats_tbl on small frames, with and without the fast
+path that formats small tables in python.
+
+Run from the repository root: python benchmarks/bench_small_frames.py
+"""
+
+import statistics
+import sys
+import time
+
+sys.path.append("src/")
+sys.path.append("tests/")
+from conftest import sample_df_  # noqa: E402
+
+from showstats import _table  # noqa: E402
+from showstats.showstats import make_stats_tbl  # noqa: E402
+
+
+def latencies(df, table_type: str, n_calls: int = 300):
+    """Returns p50 and p99 of the wall time of one call in milliseconds"""
+    make_stats_tbl(df, table_type)  # Warm the plan cache
+    timings = []
+    for _ in range(n_calls):
+        start = time.perf_counter()
+        make_stats_tbl(df, table_type)
+        timings.append((time.perf_counter() - start) * 1000)
+    percentiles = statistics.quantiles(timings, n=100)
+
+    return percentiles[49], percentiles[98]
+
+
+def main():
+    fast_path_max_vars = _table._FAST_PATH_MAX_VARS
+    for n_rows in (10, 100, 1_000, 10_000):
+        df = sample_df_(max(n_rows, 100)).head(n_rows)
+        print(f"{n_rows:>6,} rows")
+        for table_type in ("num", "cat"):
+            for label, max_vars in (("query", 0), ("fast", fast_path_max_vars)):
+                _table._FAST_PATH_MAX_VARS = max_vars
+                p50, p99 = latencies(df, table_type)
+                print(
+                    f"    {table_type:<4}{label:<6}p50 {p50:6.2f}ms  p99 {p99:6.2f}ms"
+                )
+    _table._FAST_PATH_MAX_VARS = fast_path_max_vars
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
 from importlib.metadata import PackageNotFoundError, version
 
+from ._stats_cache import clear_stats_cache, stats_cache_info
+from ._table import plan_cache_info
 from .pl_namespace import StatsFrame
-from .showstats import show_stats
+from .showstats import show_stats, show_stats_compare
 
 try:
     __version__ = version("showstats")
@@ -12,4 +14,11 @@ finally:
     del PackageNotFoundError
 
 
-__all__ = ["show_stats", "StatsFrame"]
+__all__ = [
+    "show_stats",
+    "show_stats_compare",
+    "StatsFrame",
+    "clear_stats_cache",
+    "plan_cache_info",
+    "stats_cache_info",
+]
@@ -0,0 +1,5 @@
+import sys
+
+from showstats._cli import main
+
+sys.exit(main())
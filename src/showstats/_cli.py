@@ -0,0 +1,123 @@
+# Command line entry point: showstats data.parquet --type num --top-cols id
+# Files are scanned lazily with the polars backend, so neither numpy nor pandas
+# are ever imported.
+import argparse
+import sys
+from typing import List, Optional
+
+import polars as pl
+
+from showstats._table import _Table
+
+
+def _make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="showstats",
+        description="Print summary statistics of an Arrow IPC, Parquet or CSV file.",
+    )
+    parser.add_argument("path", help="Path to an .arrow/.ipc, .parquet or .csv file")
+    parser.add_argument(
+        "--type",
+        dest="table_type",
+        choices=("all", "num", "cat", "time", "mem"),
+        default="all",
+        help="Which table(s) to show (default: all)",
+    )
+    parser.add_argument(
+        "--top-cols",
+        nargs="+",
+        default=None,
+        metavar="COL",
+        help="Columns to put at the top of the table(s)",
+    )
+    parser.add_argument(
+        "--columns",
+        nargs="+",
+        default=None,
+        metavar="COL",
+        help="Columns to profile, names or regular expressions like '^price_.*$'",
+    )
+    parser.add_argument(
+        "--filter",
+        default=None,
+        metavar="SQL",
+        help='Only profile rows matching this SQL expression, e.g. "age > 30"',
+    )
+    parser.add_argument(
+        "--keys",
+        nargs="+",
+        default=None,
+        metavar="COL",
+        help="Columns forming a key, adds a section with duplicate keys",
+    )
+    parser.add_argument(
+        "--dist", action="store_true", help="Add a histogram sparkline column"
+    )
+    parser.add_argument(
+        "--str-len",
+        action="store_true",
+        help="Add string lengths, empty share and total bytes to the cat table",
+    )
+    parser.add_argument(
+        "--approx",
+        action="store_true",
+        help="Approximate distinct counts of categorical columns",
+    )
+    parser.add_argument(
+        "--sample",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Compute statistics on a random sample of N rows",
+    )
+    parser.add_argument(
+        "--format",
+        dest="output_format",
+        choices=("table", "csv", "json"),
+        default="table",
+        help="Output format (default: table)",
+    )
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _make_parser().parse_args(argv)
+    try:
+        _table = _Table(
+            args.path,
+            args.table_type,
+            args.top_cols,
+            args.dist,
+            backend="polars",
+            approx=args.approx,
+            sample=args.sample,
+            keys=args.keys,
+            columns=args.columns,
+            filter=None if args.filter is None else pl.sql_expr(args.filter),
+            str_len=args.str_len,
+        )
+    except (ValueError, FileNotFoundError, pl.exceptions.PolarsError) as e:
+        print(f"showstats: error: {e}", file=sys.stderr)
+        return 1
+    _table.form_stat_df(args.table_type)
+    if args.output_format == "table":
+        _table.show()
+    elif args.output_format == "csv":
+        # One csv block per table, separated by an empty line
+        blocks = [stat_df.write_csv() for stat_df in _table.stat_dfs.values()]
+        sys.stdout.write("\n".join(blocks))
+    elif args.output_format == "json":
+        import json
+
+        tables = {
+            table_type: stat_df.to_dicts()
+            for table_type, stat_df in _table.stat_dfs.items()
+        }
+        print(json.dumps(tables))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+# Side-by-side statistics of several frames, e.g. train, test and holdout splits
+from decimal import Decimal
+from typing import Dict, List
+
+import polars as pl
+
+from showstats._table import _map_table_type_to_var_types, _Table
+from showstats._utils import format_scientific
+
+# Statistics shown per frame, and those with a delta to the first frame. Fewer
+# than in the single tables, so that two frames fit into 80 characters.
+_COMPARE_COLUMNS = {
+    "num": ["NA%", "Avg", "SD", "Median"],
+    "cat": ["NA%", "Uniques", "Top 1"],
+    "time": ["NA%", "Min", "Max"],
+}
+_DELTA_FUNS = {
+    "num": {"NA%": "null_count", "Avg": "mean", "SD": "std", "Median": "median"},
+    "cat": {"NA%": "null_count", "Uniques": "n_unique"},
+    "time": {"NA%": "null_count"},
+}
+
+
+def compute_compare_tables(
+    frames: Dict[str, pl.DataFrame], table_type: str, **kwargs
+) -> Dict[str, _Table]:
+    """
+    Makes one _Table per frame, with the statistics of all frames collected
+    together by pl.collect_all, so the frames are scanned in parallel and the
+    plans of frames with the same schema are shared.
+    """
+    tables = {
+        name: _Table(df, table_type, evaluate=False, **kwargs)
+        for name, df in frames.items()
+    }
+    results = pl.collect_all([table.make_query() for table in tables.values()])
+    for table, stat_row in zip(tables.values(), results):
+        table.set_stats(stat_row)
+
+    return tables
+
+
+def _format_n(num_rows: int) -> str:
+    if num_rows < 100_000:
+        return str(num_rows)
+    return f"{Decimal(num_rows):.2E}"
+
+
+def _get_raw_stat(table: _Table, var: str, fun: str, var_types: List[str]):
+    """The statistic of var if var belongs to var_types, else None"""
+    if not any(var in table.vars_map.get(vt, []) for vt in var_types):
+        return None
+    value = table.stats.get(f"{var}{table.sep}{fun}")
+    if fun == "null_count" and value is not None:  # Share in percent
+        value = value / table._get_num_values(var) * 100
+
+    return value
+
+
+def _format_cell(value) -> str:
+    if value is None:
+        return ""
+    return str(value)
+
+
+def _format_delta(value, reference) -> str:
+    if value is None or reference is None:
+        return ""
+    if isinstance(value, bool) or isinstance(reference, bool):
+        return ""
+    if isinstance(value, int) and isinstance(reference, int):
+        return str(value - reference)
+    numbers = (int, float, Decimal)
+    if isinstance(value, numbers) and isinstance(reference, numbers):
+        return format_scientific(float(value) - float(reference))
+    return ""
+
+
+def make_compare_df(tables: Dict[str, _Table], table_type: str):
+    """
+    The table of one type with a column group per frame, followed by one group
+    per further frame with the deltas to the first frame.
+
+    Returns:
+        Optional[pl.DataFrame]: None if no frame has variables of this type
+    """
+    var_types = _map_table_type_to_var_types(table_type)
+    rows_by_frame = {}
+    variables = []
+    for name, table in tables.items():
+        table.form_stat_df(table_type)
+        stat_df = table.stat_dfs.get(table_type)
+        if stat_df is None:
+            rows_by_frame[name] = {}
+            continue
+        # The first column holds the variable names
+        var_col = stat_df.columns[0]
+        rows_by_frame[name] = {
+            row[var_col]: row for row in stat_df.iter_rows(named=True)
+        }
+        variables.extend(
+            var for var in stat_df.get_column(var_col) if var not in variables
+        )
+    if not variables:
+        return None
+
+    names = list(tables)
+    reference = names[0]
+    name_var = "Var. N=" + "/".join(_format_n(tables[name].num_rows) for name in names)
+    columns = _COMPARE_COLUMNS[table_type]
+    data = {name_var: variables}
+    for name in names:
+        for col in columns:
+            data[f"{col} {name}"] = [
+                _format_cell(rows_by_frame[name].get(var, {}).get(col))
+                for var in variables
+            ]
+    for name in names[1:]:
+        for col, fun in _DELTA_FUNS[table_type].items():
+            data[f"Δ{col} {name}"] = [
+                _format_delta(
+                    _get_raw_stat(tables[name], var, fun, var_types),
+                    _get_raw_stat(tables[reference], var, fun, var_types),
+                )
+                for var in variables
+            ]
+
+    return pl.DataFrame(data, schema=dict.fromkeys(data, pl.String))
@@ -0,0 +1,185 @@
+# Correlation matrices of numeric columns from blocked Gram-matrix products
+from typing import List, Optional
+
+import polars as pl
+
+_BLOCK_COLS = 256  # Columns per block, accumulators are _BLOCK_COLS x _BLOCK_COLS
+_CHUNK_ROWS = 16_384  # Rows converted to a 2D array at once
+
+
+def _prepare_block(df: pl.DataFrame, cols: List[str], method: str):
+    """
+    The columns of one block and their means. For Spearman, the values are
+    replaced by their ranks, a Float64 copy of the block only. For Pearson, the
+    columns are selected without a copy and cast chunk by chunk.
+    """
+    import numpy as np
+
+    exprs = [pl.col(col).cast(pl.Float64).fill_nan(None) for col in cols]
+    if method == "spearman":
+        block = df.select(expr.rank("average") for expr in exprs)  # Nulls stay
+        means = block.mean().row(0)
+    else:
+        block = df.select(cols)
+        means = block.select(expr.mean() for expr in exprs).row(0)
+    means = np.array(means, dtype=np.float64)
+
+    return block, np.nan_to_num(means)  # Columns without values
+
+
+def _to_arrays(df: pl.DataFrame, means):
+    """Centered values with nulls and NaN set to 0, and the mask of the others"""
+    import numpy as np
+
+    arr = df.select(pl.all().cast(pl.Float64)).to_numpy()
+    mask = ~np.isnan(arr)
+    arr = np.where(mask, arr - means, 0.0)
+
+    return arr, mask.astype(np.float64)
+
+
+def _corr_block(block_i, block_j, means_i, means_j, chunk_rows):
+    """
+    Correlations between two blocks of columns over pairwise complete rows.
+
+    Accumulates the counts, sums, sums of squares and cross products of the pairs
+    chunk by chunk. If a chunk has no nulls, the counts and sums are column sums
+    and only the Gram matrix x_i^T x_j is a matrix product.
+    """
+    import numpy as np
+
+    shape = (block_i.width, block_j.width)
+    n, s_x, s_y, s_xx, s_yy, s_xy = (np.zeros(shape) for _ in range(6))
+    for start in range(0, block_i.height, chunk_rows):
+        x, mask_x = _to_arrays(block_i.slice(start, chunk_rows), means_i)
+        y, mask_y = _to_arrays(block_j.slice(start, chunk_rows), means_j)
+        s_xy += x.T @ y
+        if mask_x.all() and mask_y.all():
+            n += x.shape[0]
+            s_x += x.sum(axis=0)[:, None]
+            s_y += y.sum(axis=0)[None, :]
+            s_xx += (x * x).sum(axis=0)[:, None]
+            s_yy += (y * y).sum(axis=0)[None, :]
+        else:
+            n += mask_x.T @ mask_y
+            s_x += x.T @ mask_y
+            s_y += mask_x.T @ y
+            s_xx += (x * x).T @ mask_y
+            s_yy += mask_x.T @ (y * y)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = s_xy - s_x * s_y / n
+        var_x = s_xx - s_x * s_x / n
+        var_y = s_yy - s_y * s_y / n
+        corr = cov / np.sqrt(var_x * var_y)
+    # Fewer than 2 pairs or a constant column
+    corr[(n < 2) | (var_x <= 0) | (var_y <= 0)] = np.nan
+
+    return np.clip(corr, -1.0, 1.0), n
+
+
+def compute_corr(
+    df: pl.DataFrame,
+    cols: List[str],
+    method: str = "pearson",
+    top_k: Optional[int] = None,
+    block_cols: int = _BLOCK_COLS,
+    chunk_rows: int = _CHUNK_ROWS,
+) -> pl.DataFrame:
+    """
+    Computes pairwise Pearson or Spearman correlations.
+
+    The columns are split into blocks of block_cols columns. For each pair of
+    blocks, the sufficient statistics are accumulated over chunks of chunk_rows
+    rows, which are cast to Float64 one at a time, so memory is bounded by the
+    block size and not by the number of columns. Values are centered by the
+    column means beforehand, which keeps the accumulated sums small. Nulls and
+    NaN are dropped pairwise. For Spearman, values are ranked per column over
+    all its non-null values before the Pearson correlation of the ranks, not
+    re-ranked on the complete rows of each pair, which would take one sort per
+    pair. The ranks of a block are computed for each pair of blocks it takes
+    part in, instead of for all columns at once.
+
+    Args:
+        df (pl.DataFrame): The input data frame.
+        cols (List[str]): Numeric columns.
+        method (str): "pearson" or "spearman".
+        top_k (Optional[int]): Return only the top_k pairs with the largest
+            absolute correlation instead of the matrix.
+        block_cols (int): Number of columns per block.
+        chunk_rows (int): Number of rows per chunk.
+
+    Returns:
+        pl.DataFrame: The correlation matrix with a first column "Variable", or
+        the top_k pairs with columns "Var. 1", "Var. 2", "Corr." and "N"
+    """
+    import numpy as np
+
+    if method not in ("pearson", "spearman"):
+        raise ValueError(f"method {method} not supported")
+    if top_k is not None and top_k < 1:
+        raise ValueError("top_k must be a positive number of pairs")
+    blocks = [
+        range(start, min(start + block_cols, len(cols)))
+        for start in range(0, len(cols), block_cols)
+    ]
+    if top_k is None:
+        matrix = np.empty((len(cols), len(cols)))
+    else:
+        best_corr = np.empty(0)
+        best_n = np.empty(0)
+        best_i = np.empty(0, dtype=np.int64)
+        best_j = np.empty(0, dtype=np.int64)
+    for b_i, block_i in enumerate(blocks):
+        frame_i, means_i = _prepare_block(df, [cols[i] for i in block_i], method)
+        for block_j in blocks[b_i:]:
+            if block_j is block_i:
+                frame_j, means_j = frame_i, means_i
+            else:
+                frame_j, means_j = _prepare_block(
+                    df, [cols[j] for j in block_j], method
+                )
+            corr, n = _corr_block(frame_i, frame_j, means_i, means_j, chunk_rows)
+            if top_k is None:
+                matrix[block_i.start : block_i.stop, block_j.start : block_j.stop] = (
+                    corr
+                )
+                matrix[block_j.start : block_j.stop, block_i.start : block_i.stop] = (
+                    corr.T
+                )
+                continue
+            # Merge the pairs i < j of this block into the running top_k
+            idx_i, idx_j = np.nonzero(~np.isnan(corr))
+            idx_i, idx_j = idx_i + block_i.start, idx_j + block_j.start
+            upper = idx_i < idx_j
+            idx_i, idx_j = idx_i[upper], idx_j[upper]
+            rows_i, cols_j = idx_i - block_i.start, idx_j - block_j.start
+            best_corr = np.concatenate([best_corr, corr[rows_i, cols_j]])
+            best_n = np.concatenate([best_n, n[rows_i, cols_j]])
+            best_i = np.concatenate([best_i, idx_i])
+            best_j = np.concatenate([best_j, idx_j])
+            if len(best_corr) > top_k:
+                keep = np.argpartition(-np.abs(best_corr), top_k - 1)[:top_k]
+                best_corr, best_n = best_corr[keep], best_n[keep]
+                best_i, best_j = best_i[keep], best_j[keep]
+
+    if top_k is None:
+        data = {"Variable": cols}
+        for i, col in enumerate(cols):
+            data[col] = matrix[:, i]
+        return pl.DataFrame(data).fill_nan(None)
+
+    order = np.argsort(-np.abs(best_corr), kind="stable")
+    return pl.DataFrame(
+        {
+            "Var. 1": [cols[i] for i in best_i[order]],
+            "Var. 2": [cols[j] for j in best_j[order]],
+            "Corr.": best_corr[order],
+            "N": best_n[order].astype(np.int64),
+        },
+        schema={
+            "Var. 1": pl.String,
+            "Var. 2": pl.String,
+            "Corr.": pl.Float64,
+            "N": pl.Int64,
+        },
+    )
@@ -0,0 +1,105 @@
+# Numpy backend for wide, homogeneous numeric frames
+from typing import Dict, Iterable, List
+
+import polars as pl
+
+_MIN_DENSE_COLS = 64  # Below this, the expression path is fast enough
+_MAX_DENSE_ROWS = 500  # Break-even with polars at about 700 rows, see bench_dense
+_CHUNK_COLS = 256  # Number of columns converted to a 2D array at once
+_DENSE_DTYPES = (
+    pl.Float32,
+    pl.Float64,
+    pl.Int8,
+    pl.Int16,
+    pl.Int32,
+    pl.Int64,
+    pl.UInt8,
+    pl.UInt16,
+    pl.UInt32,
+    pl.UInt64,
+)
+
+
+def _numpy_available() -> bool:
+    from importlib.util import find_spec
+
+    return find_spec("numpy") is not None
+
+
+def get_dense_blocks(
+    df: pl.DataFrame, cols: Iterable[str]
+) -> Dict[pl.DataType, List[str]]:
+    """
+    Groups the columns which can be handled by the numpy backend by dtype.
+
+    A column qualifies if it is a plain float or integer column without nulls. The
+    null count is metadata of the series, so this does not scan the data.
+
+    Args:
+        df (pl.DataFrame): The input data frame.
+        cols (Iterable[str]): Candidate columns.
+
+    Returns:
+        Dict[pl.DataType, List[str]]: Maps dtype to the qualifying columns
+    """
+    blocks = {}
+    for col in cols:
+        sr = df.get_column(col)
+        if sr.dtype in _DENSE_DTYPES and sr.null_count() == 0:
+            blocks.setdefault(sr.dtype, []).append(col)
+
+    return blocks
+
+
+def compute_dense_stats(
+    df: pl.DataFrame, cols: List[str], sep: str, chunk_cols: int = _CHUNK_COLS
+) -> dict:
+    """
+    Computes null_count, mean, std, median, min and max with axis-wise numpy kernels.
+
+    The columns must share one dtype. They are viewed as a 2D array in chunks of
+    chunk_cols columns; polars hands out a zero-copy view if the columns already
+    live in one Fortran-ordered buffer and copies the chunk otherwise.
+
+    Args:
+        df (pl.DataFrame): The input data frame, must have at least 2 rows.
+        cols (List[str]): Columns of one dtype without nulls.
+        sep (str): Separator between column and function name in the stat names.
+        chunk_cols (int): Number of columns per chunk.
+
+    Returns:
+        dict: Statistics keyed like the expression path. Columns containing NaN are
+        skipped and left to the expression path.
+    """
+    import numpy as np
+
+    stats = {}
+    for start in range(0, len(cols), chunk_cols):
+        chunk = cols[start : start + chunk_cols]
+        arr = df.select(chunk).to_numpy()
+        if arr.dtype.kind == "f":
+            has_nan = np.isnan(arr).any(axis=0)
+            if has_nan.any():
+                chunk = [c for c, nan in zip(chunk, has_nan) if not nan]
+                arr = arr[:, ~has_nan]
+        if len(chunk) == 0:
+            continue
+        mean = arr.mean(axis=0, dtype=np.float64)
+        dev = arr - mean
+        sum_sq = np.einsum("ij,ij->j", dev, dev)
+        del dev
+        results = {
+            "mean": mean.tolist(),
+            "std": np.sqrt(sum_sq / (arr.shape[0] - 1)).tolist(),
+            "min": arr.min(axis=0).tolist(),
+            "max": arr.max(axis=0).tolist(),
+        }
+        # Partitioning for the median may reuse the buffer if it is our own copy
+        overwrite = arr.flags.writeable and arr.flags.owndata
+        results["median"] = np.median(arr, axis=0, overwrite_input=overwrite).tolist()
+        for i, col in enumerate(chunk):
+            stats[f"{col}{sep}null_count"] = 0
+            for fun_name, values in results.items():
+                stats[f"{col}{sep}{fun_name}"] = values[i]
+
+    return stats
@@ -0,0 +1,131 @@
+# DuckDB backend: translates the statistics of _Table into one SQL query, so that
+# only the single result row leaves the engine
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+_REL_NAME = "showstats_rel"
+
+# Maps var-type to a regex matching the DuckDB type names of that var-type
+_DUCKDB_TYPE_PATTERNS = {
+    "num_float": r"DOUBLE|FLOAT|REAL|DECIMAL\(.*\)",
+    "num_int": r"U?(TINYINT|SMALLINT|INTEGER|BIGINT|HUGEINT)",
+    "num_bool": r"BOOLEAN",
+    "cat": r"VARCHAR|ENUM\(.*\)",
+    "date": r"DATE",
+    "datetime": r"TIMESTAMP.*",
+    "null": r'"?NULL"?',
+}
+
+
+def is_duckdb_relation(obj) -> bool:
+    """Checks for a duckdb.DuckDBPyRelation without importing duckdb"""
+    obj_type = type(obj)
+    return (
+        obj_type.__module__.lstrip("_").startswith("duckdb")
+        and obj_type.__name__ == "DuckDBPyRelation"
+    )
+
+
+def get_duckdb_cols_for_var_type(
+    cols_and_types: Iterable[Tuple[str, str]], var_type: str
+) -> List[str]:
+    if var_type not in _DUCKDB_TYPE_PATTERNS:
+        raise ValueError(f"var_type {var_type} not supported")
+    pattern = _DUCKDB_TYPE_PATTERNS[var_type]
+
+    return [
+        col for col, col_type in cols_and_types if re.fullmatch(pattern, str(col_type))
+    ]
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _make_sql_stat(col: str, var_type: str, function: str, approx: bool) -> str:
+    """SQL aggregate matching the polars expression pl.col(col).function()"""
+    if var_type == "num_bool" and function in ("mean", "std", "median"):
+        col = f"{col}::INTEGER"
+    if function == "null_count":
+        return f"COUNT(*) - COUNT({col})"
+    elif function == "mean":
+        return f"AVG({col})"
+    elif function == "std":
+        return f"STDDEV_SAMP({col})"
+    elif function == "median":
+        sql = f"MEDIAN({col})"
+    elif function == "min":
+        sql = f"MIN({col})"
+    elif function == "max":
+        sql = f"MAX({col})"
+    elif function == "n_unique":
+        if approx:
+            count_distinct = f"APPROX_COUNT_DISTINCT({col})"
+        else:
+            count_distinct = f"COUNT(DISTINCT {col})"
+        # Like polars, null counts as one value
+        return f"{count_distinct} + (COUNT(*) > COUNT({col}))::INTEGER"
+    else:
+        raise ValueError(f"Function {function} not supported")
+    if var_type == "num_float":  # Decimals are formatted as floats
+        sql = f"({sql})::DOUBLE"
+
+    return sql
+
+
+def compute_duckdb_stats(
+    rel,
+    vars_map: Dict[str, List[str]],
+    funs_map: Dict[str, Tuple[str]],
+    sep: str,
+    approx: bool = False,
+    sample: Optional[int] = None,
+) -> Tuple[dict, int]:
+    """
+    Computes the statistics of _Table in one SQL aggregate query.
+
+    The top 3 values of categorical columns are computed by grouped counts in
+    scalar subqueries of the same statement.
+
+    Args:
+        rel (duckdb.DuckDBPyRelation): The input relation.
+        vars_map (Dict[str, List[str]]): Maps var-type to columns.
+        funs_map (Dict[str, Tuple[str]]): Maps var-type to functions.
+        sep (str): Separator between column and function name in the stat names.
+        approx (bool): Use APPROX_COUNT_DISTINCT for distinct counts.
+        sample (Optional[int]): Number of rows of a reservoir sample.
+
+    Returns:
+        Tuple[dict, int]: The statistics keyed like the expression path, and the
+        number of rows
+    """
+    len_name = f"len{sep}"
+    select = [f"COUNT(*) AS {_quote(len_name)}"]
+    for var_type, cols in vars_map.items():
+        for col in cols:
+            for function in funs_map[var_type]:
+                sql = _make_sql_stat(_quote(col), var_type, function, approx)
+                select.append(f"{sql} AS {_quote(f'{col}{sep}{function}')}")
+    for col in vars_map.get("cat", []):
+        top_3 = (
+            f"(SELECT LIST(STRUCT_PACK(value := v, count := c)) FROM ("
+            f"SELECT {_quote(col)} AS v, COUNT(*) AS c FROM t "
+            f"WHERE {_quote(col)} IS NOT NULL GROUP BY 1 ORDER BY 2 DESC LIMIT 3))"
+        )
+        select.append(f"{top_3} AS {_quote(f'top_3{sep}{col}')}")
+    source = _REL_NAME
+    if sample is not None:
+        if sample < 1:
+            raise ValueError("sample must be a positive number of rows")
+        source += f" USING SAMPLE reservoir({int(sample)} ROWS) REPEATABLE (0)"
+    sql = f"WITH t AS (SELECT * FROM {source}) SELECT {', '.join(select)} FROM t"
+    result = rel.query(_REL_NAME, sql)
+    stats = dict(zip(result.columns, result.fetchone()))
+    num_rows = stats.pop(len_name)
+    for col in vars_map.get("cat", []):
+        top_3_name = f"top_3{sep}{col}"
+        stats[top_3_name] = [
+            {col: dd["value"], "count": dd["count"]} for dd in stats[top_3_name] or []
+        ]
+
+    return stats, num_rows
@@ -0,0 +1,131 @@
+# Dry run of _Table: classification, query plan and a rough cost estimate
+from typing import Dict, List
+
+import polars as pl
+
+from showstats._render import render_table
+from showstats._utils import format_bytes
+
+# Rough single-threaded cost per row, measured on float, integer and string
+# columns of 10 million rows
+_NS_PER_ROW = {
+    "scan": 1,  # null_count, mean, std, min, max
+    "hist": 5,
+    "median": 10,  # Copy and partition
+    "approx_n_unique": 5,  # HyperLogLog
+    "n_unique": 50,  # Hash table of the distinct values
+    "value_counts": 100,  # Hash table of the distinct values and sort
+}
+_DEFAULT_BYTES = 8  # Bytes per value if unknown
+_DEFAULT_STR_BYTES = 16  # Bytes per string if unknown
+
+
+def _get_kind(stat_name: str, var: str, sep: str, approx: bool) -> str:
+    if var.endswith(sep):  # Pseudo-variable of the keys, hashes are counted exactly
+        return "n_unique" if stat_name == f"{var}n_unique" else "value_counts"
+    if stat_name.startswith(f"{var}{sep}"):
+        function = stat_name[len(var) + len(sep) :]
+    else:  # Extra statistics are prefixed, e.g. top_3____var
+        function = stat_name.split(sep, 1)[0]
+    if function == "median":
+        return "median"
+    elif function in ("n_unique", "approx_n_unique"):
+        return "approx_n_unique" if approx else "n_unique"
+    elif function == "top_3":
+        return "value_counts"
+    elif function == "hist":
+        return "hist"
+    return "scan"
+
+
+def _get_bytes_per_value(df, var: str, var_type: str, num_rows: int) -> float:
+    if isinstance(df, pl.DataFrame) and var in df.columns and num_rows > 0:
+        return max(df.get_column(var).estimated_size() / num_rows, 1)
+    if var_type == "cat":
+        return _DEFAULT_STR_BYTES
+    return _DEFAULT_BYTES
+
+
+def _format_seconds(seconds: float) -> str:
+    if seconds < 1:
+        return f"{seconds * 1000:.0f} ms"
+    return f"{seconds:.1f} s"
+
+
+def estimate_costs(table, df, num_rows: int) -> pl.DataFrame:
+    """
+    Estimates time and extra memory of the statistics per column group.
+
+    Cheap aggregations stream over the column. The exact median copies the
+    column, n_unique and value_counts build a hash table, whose size is bounded
+    by the number of rows. Memory is the extra memory of the most expensive
+    column of the group, time is the sum over the group divided by the number
+    of threads of polars.
+    """
+    groups: Dict[str, List[str]] = dict(table.vars_map)
+    if table.keys is not None:
+        groups["keys"] = [table.key_var]
+    n_threads = pl.thread_pool_size()
+    rows = []
+    for group, variables in groups.items():
+        n_exprs = 0
+        total_ns = 0.0
+        max_bytes = 0.0
+        expensive = set()
+        for var in variables:
+            if var == table.key_var:
+                bytes_per_value = 8  # UInt64 hash
+            else:
+                bytes_per_value = _get_bytes_per_value(df, var, group, num_rows)
+            col_bytes = 0.0
+            for stat_name in table.exprs_map[var]:
+                kind = _get_kind(stat_name, var, table.sep, table.approx)
+                n_exprs += 1
+                total_ns += _NS_PER_ROW[kind] * num_rows
+                if kind == "median":
+                    col_bytes += num_rows * _DEFAULT_BYTES
+                elif kind in ("n_unique", "value_counts"):
+                    col_bytes += num_rows * (bytes_per_value + 8)
+                if kind in ("median", "n_unique", "value_counts"):
+                    expensive.add(kind)
+            max_bytes = max(max_bytes, col_bytes)
+        rows.append(
+            {
+                "Group": group,
+                "Columns": len(variables) if group != "keys" else len(table.keys),
+                "Exprs": n_exprs,
+                "Expensive": ", ".join(sorted(expensive)),
+                "Mem./col.": format_bytes(max_bytes),
+                "Time": _format_seconds(total_ns / 1e9 / n_threads),
+            }
+        )
+
+    return pl.DataFrame(rows)
+
+
+def make_explain_report(table, df) -> str:
+    """
+    Describes what _Table would compute, without computing it.
+
+    The report has the classification of the columns, the number of expressions,
+    the estimate per column group and the optimized query plan.
+    """
+    if isinstance(df, pl.LazyFrame):  # From metadata for Parquet and IPC
+        num_rows = df.select(pl.len()).collect().item()
+    else:
+        num_rows = df.height
+    expressions = [
+        expr for exprs_var in table.exprs_map.values() for expr in exprs_var.values()
+    ]
+    lines = ["-Classification" + "-" * 65]
+    for var_type, variables in table.vars_map.items():
+        lines.append(f" {var_type} ({len(variables)}): {', '.join(variables)}")
+    if table.keys is not None:
+        lines.append(f" keys ({len(table.keys)}): {', '.join(table.keys)}")
+    lines.append(f" {len(expressions)} expressions over {num_rows} rows")
+    lines.append("-Estimate per column group (rough)" + "-" * 46)
+    lines.append(render_table(estimate_costs(table, df, num_rows), max_width=80))
+    lines.append("-Optimized plan" + "-" * 65)
+    lines.append(df.lazy().select(expressions).explain())
+
+    return "\n".join(lines)
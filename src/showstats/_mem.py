@@ -0,0 +1,242 @@
+# Memory footprint of the columns and the narrowest dtypes that hold their values
+from typing import Dict, Optional, Tuple
+
+import polars as pl
+
+from showstats._utils import format_bytes
+
+_FLOAT32_RTOL = 1e-6  # Relative error allowed when rounding to Float32
+_CATEGORICAL_MAX_SHARE = 0.5  # Maximum share of distinct strings for Categorical
+_SIGNED_INTS = (pl.Int8, pl.Int16, pl.Int32, pl.Int64)
+_UNSIGNED_INTS = (pl.UInt8, pl.UInt16, pl.UInt32, pl.UInt64)
+_CATEGORICAL_CODE_BYTES = 4  # UInt32 codes
+_BYTES_PER_VALUE = {
+    pl.Boolean: 1 / 8,
+    pl.Int8: 1,
+    pl.UInt8: 1,
+    pl.Int16: 2,
+    pl.UInt16: 2,
+    pl.Int32: 4,
+    pl.UInt32: 4,
+    pl.Float32: 4,
+    pl.Date: 4,
+    pl.Int64: 8,
+    pl.UInt64: 8,
+    pl.Float64: 8,
+    pl.Datetime: 8,
+    pl.Duration: 8,
+    pl.Time: 8,
+    pl.Categorical: _CATEGORICAL_CODE_BYTES,
+}
+_OFFSET_BYTES = 8  # Per list, for the offsets
+
+
+def make_float32_check_expr(column: pl.Expr, name: str) -> pl.Expr:
+    """
+    Counts the values which change by more than _FLOAT32_RTOL when rounded to
+    Float32, including values out of its range.
+    """
+    rounded = column.cast(pl.Float32).cast(pl.Float64)
+
+    return ((rounded - column).abs() > column.abs() * _FLOAT32_RTOL).sum().alias(name)
+
+
+def _get_binary_lens(column: pl.Expr) -> pl.Expr:
+    if not hasattr(column.bin, "size"):  # Older polars
+        return column.bin.encode("hex").str.len_bytes() // 2
+    return column.bin.size()
+
+
+def make_size_expr(column: pl.Expr, dtype) -> pl.Expr:
+    """
+    Estimates the bytes of a column without statistics in the memory table, i.e.
+    nested, binary, duration and time columns of lazy frames: the values, the
+    offsets of lists and a validity bitmap if the column has nulls.
+    """
+    validity = pl.when(column.null_count() > 0).then(column.len() / 8).otherwise(0)
+    if dtype == pl.Null:
+        return pl.lit(0.0)
+    elif dtype == pl.String:
+        values = column.str.len_bytes().sum()
+    elif dtype == pl.Binary:
+        values = _get_binary_lens(column).sum()
+    elif dtype == pl.List:
+        values = column.len() * _OFFSET_BYTES + make_size_expr(
+            column.explode(), dtype.inner
+        )
+    elif dtype == pl.Array:
+        values = make_size_expr(column.arr.explode(), dtype.inner)
+    elif dtype == pl.Struct:
+        values = pl.sum_horizontal(
+            make_size_expr(column.struct.field(field.name), field.dtype)
+            for field in dtype.fields
+        )
+    else:
+        values = _BYTES_PER_VALUE.get(dtype.base_type(), 8) * column.len()
+
+    return (values + validity).cast(pl.Float64)
+
+
+def _get_int_range(dtype) -> tuple:
+    bits = _BYTES_PER_VALUE[dtype.base_type()] * 8
+    if dtype in _SIGNED_INTS:
+        return -(1 << (bits - 1)), (1 << (bits - 1)) - 1
+    return 0, (1 << bits) - 1
+
+
+def _get_int_downcast(dtype, lo: int, hi: int):
+    """The narrowest integer type of the same signedness holding [lo, hi]"""
+    family = _SIGNED_INTS if dtype in _SIGNED_INTS else _UNSIGNED_INTS
+    for candidate in family:
+        if _BYTES_PER_VALUE[candidate] >= _BYTES_PER_VALUE[dtype.base_type()]:
+            return None
+        min_value, max_value = _get_int_range(candidate)
+        if min_value <= lo and hi <= max_value:
+            return candidate
+    return None
+
+
+def _format_dtype(dtype) -> str:
+    if dtype == pl.Datetime:
+        time_zone = "" if dtype.time_zone is None else f", {dtype.time_zone}"
+        return f"Datetime({dtype.time_unit}{time_zone})"
+    elif dtype == pl.Enum:
+        return f"Enum({len(dtype.categories)})"
+    return str(dtype)
+
+
+def _estimate_size(table, var: str, dtype) -> float:
+    """Size of a column of a lazy frame, by the measure of estimated_size"""
+    size_name = f"size{table.sep}{var}"
+    if size_name in table.stats:  # Column without statistics
+        return table.stats[size_name]
+    elif dtype == pl.String:
+        str_len = table.stats[f"str_len{table.sep}{var}"]
+        return 0 if str_len is None else str_len["bytes"]
+    elif dtype == pl.Null:
+        return 0
+    elif dtype == pl.Enum:  # Codes of the smallest sufficient width
+        n_categories = len(dtype.categories)
+        bytes_per_value = (
+            1 if n_categories <= 256 else 2 if n_categories <= 65536 else 4
+        )
+    else:
+        bytes_per_value = _BYTES_PER_VALUE.get(dtype.base_type(), 8)
+    size = bytes_per_value * table.num_rows
+    if table.stats[f"{var}{table.sep}null_count"]:  # Validity bitmap
+        size += table.num_rows / 8
+    return size
+
+
+def get_downcast(table, var: str) -> Optional[pl.DataType]:
+    """The narrowest safe dtype of var, None if it cannot be narrowed"""
+    dtype = table.dtypes[var]
+    sep = table.sep
+    if dtype in _SIGNED_INTS or dtype in _UNSIGNED_INTS:
+        lo, hi = table.stats[f"{var}{sep}min"], table.stats[f"{var}{sep}max"]
+        if lo is None or hi is None:
+            return None
+        return _get_int_downcast(dtype, lo, hi)
+    elif dtype == pl.Float64:
+        n_changed = table.stats[f"f32_check{sep}{var}"]
+        if n_changed == 0 and table.stats[f"{var}{sep}null_count"] < table.num_rows:
+            return pl.Float32
+    elif dtype == pl.String:
+        n_unique = table.stats[f"{var}{sep}n_unique"]
+        str_len = table.stats[f"str_len{sep}{var}"]
+        if n_unique is None or str_len is None or str_len["n"] == 0:
+            return None
+        if n_unique <= str_len["n"] * _CATEGORICAL_MAX_SHARE:
+            return pl.Categorical()
+    return None
+
+
+def _project_size(table, var: str, size: float, downcast) -> float:
+    dtype = table.dtypes[var]
+    if downcast == pl.Categorical:  # Codes plus the distinct strings
+        str_len = table.stats[f"str_len{table.sep}{var}"]
+        n_unique = table.stats[f"{var}{table.sep}n_unique"]
+        return _CATEGORICAL_CODE_BYTES * table.num_rows + n_unique * str_len["mean"]
+    return (
+        size
+        * _BYTES_PER_VALUE[downcast.base_type()]
+        / _BYTES_PER_VALUE[dtype.base_type()]
+    )
+
+
+def _advise(table, var: str) -> Tuple[float, Optional[pl.DataType], float]:
+    """Size of var, its downcast if it saves memory and the size afterwards"""
+    if table.sizes is not None:
+        size = table.sizes[var]
+    else:
+        size = _estimate_size(table, var, table.dtypes[var])
+    downcast = get_downcast(table, var)
+    if downcast is None:
+        return size, None, size
+    new_size = _project_size(table, var, size, downcast)
+    if new_size >= size:  # E.g. short strings
+        return size, None, size
+    return size, downcast, new_size
+
+
+def get_downcasts(table) -> Dict[str, pl.DataType]:
+    """Maps each column which can be narrowed without loss to its new dtype"""
+    downcasts = {}
+    for variables in table.vars_map.values():
+        for var in variables:
+            _, downcast, _ = _advise(table, var)
+            if downcast is not None:
+                downcasts[var] = downcast
+
+    return downcasts
+
+
+def make_mem_df(table, name_var: str) -> pl.DataFrame:
+    """
+    The memory table: size of each column, its narrowest safe dtype and the
+    projected size after the downcast, with a total row.
+
+    Integers are narrowed to the smallest type of the same signedness holding
+    their range, Float64 to Float32 if all values round-trip within a relative
+    error of _FLOAT32_RTOL, and strings to Categorical if at most half of the
+    values are distinct and this saves memory. Columns of other types, e.g.
+    lists, structs or binary, are listed without advice, so that the total
+    describes the whole frame.
+    """
+    rows = []
+    total_size = 0.0
+    total_new_size = 0.0
+    variables = table.column_order or [
+        var for variables in table.vars_map.values() for var in variables
+    ]
+    # Columns of other types, e.g. lists, count towards the total
+    variables = variables + [var for var in table.dtypes if var not in variables]
+    for var in variables:
+        size, downcast, new_size = _advise(table, var)
+        total_size += size
+        total_new_size += new_size
+        rows.append(
+            {
+                name_var: var,
+                "Dtype": _format_dtype(table.dtypes[var]),
+                "Size": format_bytes(size),
+                "Downcast": "" if downcast is None else _format_dtype(downcast),
+                "New size": "" if downcast is None else format_bytes(new_size),
+                "Saved%": (
+                    "" if downcast is None else str(round((1 - new_size / size) * 100))
+                ),
+            }
+        )
+    saved = total_size - total_new_size
+    rows.append(
+        {
+            name_var: "Total",
+            "Dtype": "",
+            "Size": format_bytes(total_size),
+            "Downcast": "",
+            "New size": format_bytes(total_new_size),
+            "Saved%": str(round(saved / total_size * 100)) if total_size else "0",
+        }
+    )
+
+    return pl.DataFrame(rows, schema=dict.fromkeys(rows[0], pl.String))
@@ -0,0 +1,88 @@
+# Which columns are missing together: null co-occurrence and null patterns
+from typing import List
+
+import polars as pl
+
+_CHUNK_ROWS = 4_096  # Rows of the null mask per product, exact in float32
+_WORD_BITS = 64  # Columns packed into one UInt64 per row
+
+
+def compute_null_cooccurrence(
+    df: pl.DataFrame, cols: List[str], chunk_rows: int = _CHUNK_ROWS
+) -> pl.DataFrame:
+    """
+    Counts the rows in which both columns of each pair are null.
+
+    With the null masks of a chunk of rows as a 0/1 matrix M, the counts of all
+    pairs are the Gram matrix M.T @ M, which is accumulated over chunks of
+    chunk_rows rows. The diagonal holds the null counts. Requires numpy.
+
+    Returns:
+        pl.DataFrame: The symmetric matrix with a first column "Variable"
+    """
+    import numpy as np
+
+    df = df.select(cols)
+    counts = np.zeros((len(cols), len(cols)), dtype=np.int64)
+    for start in range(0, df.height, chunk_rows):
+        chunk = df.slice(start, chunk_rows).select(pl.all().is_null())
+        mask = chunk.to_numpy().astype(np.float32)
+        counts += (mask.T @ mask).astype(np.int64)
+    data = {"Variable": pl.Series(cols, dtype=pl.String)}
+    for j, col in enumerate(cols):
+        data[col] = counts[:, j].tolist()
+
+    return pl.DataFrame(data)
+
+
+def compute_null_patterns(
+    df: pl.DataFrame, cols: List[str], top_k: int, num_rows: int
+) -> pl.DataFrame:
+    """
+    Finds the most frequent combinations of null columns per row.
+
+    The null mask of each row is packed into one UInt64 per 64 columns, which
+    are grouped and counted.
+
+    Returns:
+        pl.DataFrame: Columns "Null columns" (comma separated, "(none)" for
+        complete rows), "N" and "%", sorted by N descending
+    """
+    if len(cols) == 0:  # Only complete rows
+        return pl.DataFrame(
+            {"Null columns": ["(none)"], "N": [num_rows], "%": [100.0]},
+            schema={"Null columns": pl.String, "N": pl.Int64, "%": pl.Float64},
+        )
+    words = []
+    for w, start in enumerate(range(0, len(cols), _WORD_BITS)):
+        bits = [
+            pl.col(col).is_null().cast(pl.UInt64) * pl.lit(1 << b, dtype=pl.UInt64)
+            for b, col in enumerate(cols[start : start + _WORD_BITS])
+        ]
+        words.append(pl.sum_horizontal(bits).alias(f"word_{w}"))
+    word_names = [f"word_{w}" for w in range(len(words))]
+    top = (
+        df.select(words)
+        .group_by(word_names)
+        .len()
+        .sort(["len", *word_names], descending=[True] + [False] * len(word_names))
+        .head(top_k)
+    )
+    patterns = []
+    for row in top.select(word_names).iter_rows():
+        null_cols = [
+            cols[w * _WORD_BITS + b]
+            for w, word in enumerate(row)
+            for b in range(_WORD_BITS)
+            if word >> b & 1
+        ]
+        patterns.append(", ".join(null_cols) if null_cols else "(none)")
+
+    return pl.DataFrame(
+        {
+            "Null columns": patterns,
+            "N": top.get_column("len").cast(pl.Int64),
+            "%": top.get_column("len") / num_rows * 100,
+        },
+        schema={"Null columns": pl.String, "N": pl.Int64, "%": pl.Float64},
+    )
@@ -0,0 +1,215 @@
+# Renders the stat tables to text from explicit settings, without pl.Config
+#
+# The layout follows the one polars produces with tbl_formatting="NOTHING",
+# left-aligned cells and hidden shape and dtypes: each cell is padded by one
+# space on both sides, and if the table is wider than max_width, the content of
+# the widest columns is wrapped. pl.Config is process-global, so formatting
+# through it is not thread-safe and leaks into unrelated prints.
+#
+# Widths are display widths, as in polars: East Asian wide and fullwidth
+# characters take two cells, combining marks none. The layout equals the one of
+# polars for ASCII and East Asian text. Polars pads some other non-ASCII text,
+# e.g. accented Latin letters, by an extra cell and wraps non-ASCII text at
+# slightly different widths; these quirks are not reproduced.
+import unicodedata
+from typing import List, Tuple
+
+import polars as pl
+
+_MIN_FREE_CHARS = 2  # A line is complete if fewer chars are free
+_PADDING = 2  # One space left and right of each cell
+_MIN_SAVED_CHARS = 3  # A wrapped column keeps its narrower width if this is saved
+
+
+def _get_width(text: str) -> int:
+    """Number of terminal cells text takes"""
+    if text.isascii():
+        return len(text)
+    return sum(_get_char_width(char) for char in text)
+
+
+def _get_char_width(char: str) -> int:
+    if unicodedata.combining(char):
+        return 0
+    return 2 if unicodedata.east_asian_width(char) in ("W", "F") else 1
+
+
+def _split_at_width(text: str, width: int) -> Tuple[str, str]:
+    """Splits text after the longest start that fits into width cells"""
+    if text.isascii():
+        return text[:width], text[width:]
+    used = 0
+    for i, char in enumerate(text):
+        used += _get_char_width(char)
+        if used > width:
+            return text[:i], text[i:]
+    return text, ""
+
+
+def _pad(text: str, width: int) -> str:
+    return text + " " * (width - _get_width(text))
+
+
+def _format_value(value, max_str_len: int) -> str:
+    if value is None:
+        return ""
+    elif isinstance(value, bool):
+        return "true" if value else "false"
+    elif isinstance(value, float):
+        return f"{value:.2f}"
+    text = str(value)
+    if len(text) > max_str_len:
+        text = text[:max_str_len] + "…"
+    return text
+
+
+def _split_line(line: str, width: int) -> List[str]:
+    """Wraps one line at spaces, splitting words longer than width"""
+    lines = []
+    words = line.split(" ")
+    words.reverse()
+    current = ""
+    while words:
+        word = words.pop()
+        current_width = _get_width(current)
+        word_width = _get_width(word)
+        added = current_width + word_width + (1 if current else 0)
+        remaining = width - current_width - (1 if current else 0)
+        if added <= width:
+            current = f"{current} {word}" if current else word
+            if width > _MIN_FREE_CHARS and width - added < _MIN_FREE_CHARS:
+                lines.append(current)
+                current = ""
+            continue
+        if current and word_width > width and remaining > _MIN_FREE_CHARS:
+            # Fill the current line with the start of the long word
+            start, rest = _split_at_width(word, remaining)
+            lines.append(f"{current} {start}")
+            words.append(rest)
+            current = ""
+            continue
+        if current:
+            lines.append(current)
+            current = ""
+        if word_width <= width:
+            words.append(word)
+        else:
+            start, rest = _split_at_width(word, width)
+            if not start:  # A wide character in a column of width 1
+                start, rest = word[0], word[1:]
+            lines.append(start)
+            words.append(rest)
+    if current:
+        lines.append(current)
+
+    return lines or [""]
+
+
+def _split_cell(cell: str, width: int) -> List[str]:
+    lines = []
+    for line in cell.split("\n"):
+        if _get_width(line) > width:
+            lines.extend(_split_line(line, width))
+        else:
+            lines.append(line)
+
+    return lines
+
+
+def _get_column_widths(columns: List[List[str]], max_width: int) -> List[int]:
+    """
+    Distributes max_width over the columns.
+
+    Columns narrower than the average free width keep their width. The other
+    columns are then wrapped at the average free width, in order, and keep the
+    width of their longest wrapped line if that saves at least 3 chars. Finally,
+    the remaining width is split evenly among the columns still left.
+    """
+    content_widths = [
+        max(_get_width(line) for cell in column for line in cell.split("\n"))
+        for column in columns
+    ]
+    remaining_width = max_width - _PADDING * len(columns)
+    widths = [None] * len(columns)
+    n_remaining = len(columns)
+
+    found = True
+    while found and n_remaining > 0:
+        found = False
+        average = remaining_width // n_remaining
+        if average == 0:
+            break
+        for i, content_width in enumerate(content_widths):
+            if widths[i] is None and content_width <= average:
+                widths[i] = content_width
+                remaining_width -= content_width
+                n_remaining -= 1
+                if n_remaining == 0:
+                    break
+                average = remaining_width // n_remaining
+                found = True
+
+    found = True
+    while found and n_remaining > 0:
+        found = False
+        average = remaining_width // n_remaining
+        if average == 0:
+            break
+        for i, column in enumerate(columns):
+            if widths[i] is not None:
+                continue
+            longest = max(
+                _get_width(line)
+                for cell in column
+                for line in _split_cell(cell, average)
+            )
+            if average - longest >= _MIN_SAVED_CHARS:
+                widths[i] = longest
+                remaining_width -= longest
+                n_remaining -= 1
+                if n_remaining == 0:
+                    break
+                average = remaining_width // n_remaining
+                found = True
+
+    if n_remaining > 0:
+        average, extra = divmod(max(remaining_width, n_remaining), n_remaining)
+        for i in range(len(widths)):
+            if widths[i] is None:
+                widths[i] = average + (1 if extra > 0 else 0)
+                extra -= 1
+
+    return widths
+
+
+def render_table(df: pl.DataFrame, max_width: int = 80, max_str_len: int = 100) -> str:
+    """
+    Formats a data frame as a borderless, left-aligned text table.
+
+    Nulls are rendered as empty cells and floats with 2 decimals. Strings
+    longer than max_str_len are truncated.
+
+    Args:
+        df (pl.DataFrame): The table.
+        max_width (int): Maximum width of the table in characters.
+        max_str_len (int): Maximum length of a cell before truncation.
+
+    Returns:
+        str: The table, one line per text line without a trailing newline
+    """
+    columns = [
+        [name] + [_format_value(value, max_str_len) for value in df.get_column(name)]
+        for name in df.columns
+    ]
+    widths = _get_column_widths(columns, max_width)
+    lines = []
+    for row in zip(*columns):
+        cells = [_split_cell(cell, width) for cell, width in zip(row, widths)]
+        for i in range(max(len(cell) for cell in cells)):
+            parts = [
+                _pad(cell[i], width) if i < len(cell) else " " * width
+                for cell, width in zip(cells, widths)
+            ]
+            lines.append("".join(f" {part} " for part in parts))
+
+    return "\n".join(lines)
@@ -0,0 +1,199 @@
+# Cache of the statistics of single columns, keyed on the identity of their buffers
+#
+# Polars shares the buffers of unchanged columns between frames, e.g. after
+# with_columns, select or rename. The buffer addresses are read through the
+# Arrow C stream interface, which exports them without a copy. Each entry keeps
+# a reference to its series, so the buffers cannot be freed and their addresses
+# cannot be reused by other data while the entry exists.
+import ctypes
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Optional
+
+import polars as pl
+
+_STATS_CACHE_SIZE = 256  # Number of cached columns
+
+
+class _ArrowArray(ctypes.Structure):
+    pass
+
+
+_ArrowArray._fields_ = [
+    ("length", ctypes.c_int64),
+    ("null_count", ctypes.c_int64),
+    ("offset", ctypes.c_int64),
+    ("n_buffers", ctypes.c_int64),
+    ("n_children", ctypes.c_int64),
+    ("buffers", ctypes.POINTER(ctypes.c_void_p)),
+    ("children", ctypes.POINTER(ctypes.POINTER(_ArrowArray))),
+    ("dictionary", ctypes.POINTER(_ArrowArray)),
+    ("release", ctypes.CFUNCTYPE(None, ctypes.POINTER(_ArrowArray))),
+    ("private_data", ctypes.c_void_p),
+]
+
+
+class _ArrowSchema(ctypes.Structure):
+    pass
+
+
+_ArrowSchema._fields_ = [
+    ("format", ctypes.c_char_p),
+    ("name", ctypes.c_char_p),
+    ("metadata", ctypes.c_char_p),
+    ("flags", ctypes.c_int64),
+    ("n_children", ctypes.c_int64),
+    ("children", ctypes.POINTER(ctypes.POINTER(_ArrowSchema))),
+    ("dictionary", ctypes.POINTER(_ArrowSchema)),
+    ("release", ctypes.CFUNCTYPE(None, ctypes.POINTER(_ArrowSchema))),
+    ("private_data", ctypes.c_void_p),
+]
+
+
+class _ArrowArrayStream(ctypes.Structure):
+    pass
+
+
+_ArrowArrayStream._fields_ = [
+    (
+        "get_schema",
+        ctypes.CFUNCTYPE(
+            ctypes.c_int,
+            ctypes.POINTER(_ArrowArrayStream),
+            ctypes.POINTER(_ArrowSchema),
+        ),
+    ),
+    (
+        "get_next",
+        ctypes.CFUNCTYPE(
+            ctypes.c_int,
+            ctypes.POINTER(_ArrowArrayStream),
+            ctypes.POINTER(_ArrowArray),
+        ),
+    ),
+    ("get_last_error", ctypes.c_void_p),
+    ("release", ctypes.c_void_p),  # Called by the destructor of the capsule
+    ("private_data", ctypes.c_void_p),
+]
+
+_capsule_get_pointer = ctypes.pythonapi.PyCapsule_GetPointer
+_capsule_get_pointer.restype = ctypes.c_void_p
+_capsule_get_pointer.argtypes = [ctypes.py_object, ctypes.c_char_p]
+
+
+# String and binary views end with a buffer of the sizes of the data buffers,
+# which is allocated anew on each export
+_VIEW_FORMATS = (b"vu", b"vz")
+
+
+def _get_array_key(array: _ArrowArray, schema: _ArrowSchema) -> tuple:
+    children = tuple(
+        _get_array_key(array.children[i].contents, schema.children[i].contents)
+        for i in range(array.n_children)
+    )
+    n_buffers = array.n_buffers
+    if schema.format in _VIEW_FORMATS:
+        n_buffers -= 1
+    buffers = tuple(array.buffers[i] for i in range(n_buffers))
+
+    return (array.offset, array.length, buffers, children)
+
+
+def get_buffer_key(s: pl.Series) -> Optional[tuple]:
+    """
+    Offset, length and buffer addresses of each chunk of the series, or None if
+    they are not available.
+
+    Categoricals are converted on export, so their physical codes are used.
+    """
+    s = s.to_physical()
+    if not hasattr(s, "__arrow_c_stream__"):  # Older polars
+        return None
+    capsule = s.__arrow_c_stream__()
+    address = _capsule_get_pointer(capsule, b"arrow_array_stream")
+    stream = _ArrowArrayStream.from_address(address)
+    schema = _ArrowSchema()
+    if stream.get_schema(stream, schema) != 0:
+        return None
+    key = []
+    try:
+        while True:
+            array = _ArrowArray()
+            if stream.get_next(stream, array) != 0:
+                return None
+            if not array.release:  # End of stream
+                break
+            try:
+                key.append(_get_array_key(array, schema))
+            finally:
+                array.release(array)
+    finally:
+        schema.release(schema)
+
+    return tuple(key)
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class _StatsCache:
+    """LRU cache of the statistics of single columns, safe to use from threads"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()  # Maps key to (series, statistics)
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[dict]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: tuple, s: pl.Series, stats: dict):
+        with self.lock:
+            self.entries[key] = (s, stats)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:  # Evict least recently used
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self) -> CacheInfo:
+        with self.lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self.entries))
+
+
+_stats_cache = _StatsCache(_STATS_CACHE_SIZE)
+
+
+def get_column_stats(key: tuple) -> Optional[dict]:
+    return _stats_cache.get(key)
+
+
+def put_column_stats(key: tuple, s: pl.Series, stats: dict):
+    _stats_cache.put(key, s, stats)
+
+
+def stats_cache_info() -> CacheInfo:
+    """Hits, misses, maximum and current number of cached columns"""
+    return _stats_cache.info()
+
+
+def clear_stats_cache():
+    """Drops all cached statistics and the references to their columns"""
+    _stats_cache.clear()
@@ -1,13 +1,193 @@
-from typing import TYPE_CHECKING, Iterable, Tuple, Union
+import math
+import random
+import sys
+import time
+from decimal import Decimal
+from functools import lru_cache
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import polars as pl
-from polars import selectors as cs
 
-from showstats._utils import convert_df_scientific
+from showstats._dense import (
+    _MAX_DENSE_ROWS,
+    _MIN_DENSE_COLS,
+    _numpy_available,
+    compute_dense_stats,
+    get_dense_blocks,
+)
+from showstats._duckdb import (
+    compute_duckdb_stats,
+    get_duckdb_cols_for_var_type,
+    is_duckdb_relation,
+)
+from showstats._explain import make_explain_report
+from showstats._mem import make_float32_check_expr, make_mem_df, make_size_expr
+from showstats._render import render_table
+from showstats._stats_cache import (
+    get_buffer_key,
+    get_column_stats,
+    put_column_stats,
+)
+from showstats._utils import (
+    convert_df_scientific,
+    format_bytes,
+    format_scientific,
+    make_hist_expr,
+    make_sparkline,
+    make_str_len_expr,
+)
 
 if TYPE_CHECKING:
+    import duckdb
     import pandas
 
+_N_BINS = 8  # Number of histogram bins for the Dist column
+_DIST_VAR_TYPES = ("num_float", "num_int", "num_bool", "date", "datetime")
+_ANYTIME_SAMPLE_ROWS = 10_000  # Rows used for estimates in anytime mode
+_ANYTIME_BATCH_COLS = 16  # Variables per batch in anytime mode
+_ANYTIME_SLICES = 10  # Slices making up the sample of a lazy frame in anytime mode
+_PYARROW_IMPORT_BUDGET_MS = 1_000  # Importing pyarrow takes about 0.1 s
+_PLAN_CACHE_SIZE = 256  # Number of cached schemas and stat specs
+_FAST_PATH_MAX_VARS = 256  # Tables with fewer variables are formatted eagerly
+_SAMPLE_MARGIN_SDS = 6  # Extra candidates of lazy samples, in standard deviations
+
+
+def _scan_path(path: Union[str, Path]) -> pl.LazyFrame:
+    """
+    Lazily scans a file, picking the reader by file extension.
+
+    Arrow IPC files are memory-mapped, so only the buffers of the projected columns
+    are paged in. Parquet files are scanned with projection pushdown, CSV files are
+    read in batches by the lazy engine.
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix in (".arrow", ".ipc", ".feather"):
+        return pl.scan_ipc(path)  # Memory-mapped by default
+    elif suffix == ".parquet":
+        return pl.scan_parquet(path)
+    elif suffix == ".csv":
+        return pl.scan_csv(path)
+    elif suffix == ".tsv":
+        return pl.scan_csv(path, separator="\t")
+    else:
+        raise ValueError(f"File type {suffix} not supported")
+
+
+def _get_lazy_schema(df: pl.LazyFrame) -> Dict[str, pl.DataType]:
+    """The schema of a lazy frame, without the warning of newer polars"""
+    if not hasattr(df, "collect_schema"):  # Older polars
+        return dict(df.schema)
+    return dict(df.collect_schema())
+
+
+def _get_column_names(df: Union[pl.DataFrame, pl.LazyFrame]):
+    if isinstance(df, pl.LazyFrame):
+        return list(_get_lazy_schema(df))
+    return df.columns
+
+
+def _select_and_filter(
+    df: Union[pl.DataFrame, pl.LazyFrame],
+    columns=None,
+    filter: Optional[pl.Expr] = None,
+    keys: Optional[List[str]] = None,
+):
+    """
+    Restricts the input to the given columns and the rows matching filter.
+
+    Lazy frames stay lazy, so the optimizer pushes the projection and the
+    predicate into the scan: only the needed columns and, for Parquet, the
+    matching row groups are read. Data frames go through a lazy query as well,
+    so only the selected columns are filtered and copied.
+    """
+    if columns is not None:
+        if isinstance(columns, str) or not isinstance(columns, Iterable):
+            columns = [columns]
+        exprs = [pl.col(col) if isinstance(col, str) else col for col in columns]
+        names = _get_column_names(df.lazy().select(exprs))
+        names += [key for key in keys or [] if key not in names]
+        if len(names) == 0:
+            raise ValueError("columns must select at least one column")
+    else:
+        names = None
+    if filter is None:
+        return df if names is None else df.select(names)
+    lazy_df = df.lazy().filter(filter)
+    if names is not None:
+        lazy_df = lazy_df.select(names)
+    if isinstance(df, pl.LazyFrame):
+        return lazy_df
+    return lazy_df.collect()
+
+
+def _sample_rows(df: Union[pl.DataFrame, pl.LazyFrame], n: int, seed: int = 0):
+    """
+    Draws n rows without replacement, or keeps all rows if there are fewer.
+
+    Lazy frames are sampled without a permutation of all rows: the row count
+    is taken from the metadata where the format has it, and a row is kept if
+    the hash of its index falls below a threshold, which the scan evaluates
+    per batch. Of these slightly more than n candidates, the n with the
+    smallest hashes are drawn.
+    """
+    if n < 1:
+        raise ValueError("sample must be a positive number of rows")
+    if isinstance(df, pl.LazyFrame):
+        num_rows = df.select(pl.len()).collect().item()
+        if n >= num_rows:
+            return df
+        n_candidates = n + _SAMPLE_MARGIN_SDS * math.sqrt(n) + 10
+        threshold = min(int(n_candidates / num_rows * 2**64), 2**64 - 1)
+        index_name = "row_index____"
+        row_hash = pl.col(index_name).hash(seed=seed)
+        return (
+            df.with_row_index(index_name)
+            .filter(row_hash < pl.lit(threshold, dtype=pl.UInt64))
+            .sort(row_hash)
+            .head(n)
+            .drop(index_name)
+        )
+    if n >= df.height:
+        return df
+    return df.sample(n=n, seed=seed)
+
+
+def _read_parquet_null_counts(path: Union[str, Path]) -> Dict[str, int]:
+    """
+    Null counts of the top-level columns from the statistics in the footer of
+    a Parquet file, without reading the data. Columns lacking statistics in
+    some row group are left out, as are all columns if pyarrow is missing.
+    """
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        return {}
+    metadata = pq.ParquetFile(path).metadata
+    null_counts = {}
+    missing = set()
+    for i in range(metadata.num_row_groups):
+        row_group = metadata.row_group(i)
+        for j in range(row_group.num_columns):
+            column = row_group.column(j)
+            name = column.path_in_schema  # Dotted path for nested columns
+            statistics = column.statistics
+            if statistics is None or not statistics.has_null_count:
+                missing.add(name)
+            else:
+                null_counts[name] = null_counts.get(name, 0) + statistics.null_count
+
+    return {name: n for name, n in null_counts.items() if name not in missing}
+
 
 # Basic idea of these helper functions:
 #   table_type --> var_types --> functions
@@ -17,6 +197,13 @@ def _check_input_maybe_try_transform(input):
             raise ValueError("Input data frame must have rows and columns")
         else:
             return input
+    elif isinstance(input, (str, Path)):
+        input = _scan_path(input)
+    if isinstance(input, pl.LazyFrame):
+        # The number of rows is only known once the statistics are collected
+        if len(_get_column_names(input)) == 0:
+            raise ValueError("Input data frame must have rows and columns")
+        return input
     else:
         print("Attempting to convert input to polars.DataFrame")
         try:
@@ -29,41 +216,127 @@ def _check_input_maybe_try_transform(input):
         return out
 
 
+# Maps var-type to the polars dtypes of that var-type
+_VAR_TYPE_DTYPES = {
+    "num_float": (pl.Decimal, pl.Float32, pl.Float64),
+    "num_int": (
+        pl.Int8,
+        pl.Int16,
+        pl.Int32,
+        pl.Int64,
+        pl.UInt8,
+        pl.UInt16,
+        pl.UInt32,
+        pl.UInt64,
+    ),
+    "num_bool": (pl.Boolean,),
+    "cat": (pl.Enum, pl.String, pl.Categorical),
+    "date": (pl.Date,),
+    "datetime": (pl.Datetime,),
+    "null": (pl.Null,),
+}
+
+
 def _get_cols_for_var_type(df, var_type):
-    if var_type == "num_float":
-        col_vt = pl.col(
-            pl.Decimal,
-            pl.Float32,
-            pl.Float64,
-        )
-    elif var_type == "num_int":
-        col_vt = pl.col(
-            pl.Int8,
-            pl.Int16,
-            pl.Int32,
-            pl.Int64,
-            pl.UInt8,
-            pl.UInt16,
-            pl.UInt32,
-            pl.UInt64,
-        )
-    elif var_type == "num_bool":
-        col_vt = pl.col(pl.Boolean)
-    elif var_type == "cat":
-        col_vt = pl.col(pl.Enum, pl.String, pl.Categorical)
-    elif var_type == "date":
-        col_vt = pl.col(pl.Date)
-    elif var_type == "datetime":
-        col_vt = pl.col(pl.Datetime)
-    elif var_type == "null":
-        col_vt = pl.col(pl.Null)
-    else:
+    if var_type not in _VAR_TYPE_DTYPES:
         raise ValueError(f"var_type {var_type} not supported")
+    col_vt = pl.col(*_VAR_TYPE_DTYPES[var_type])
+
+    return _get_column_names(df.select(col_vt))
+
+
+def _get_var_type_of_dtype(dtype) -> Optional[str]:
+    for var_type, dtypes in _VAR_TYPE_DTYPES.items():
+        if any(dtype == dtype_vt for dtype_vt in dtypes):
+            return var_type
+    return None
+
+
+def _get_nested_vars(schema) -> List[Tuple[str, str, pl.Expr, Optional[pl.Expr]]]:
+    """
+    Classifies the fields of struct columns and the lengths and elements of list
+    columns, recursing into nested types.
+
+    Struct fields are projected with struct.field, which does not copy. A list
+    column "x" yields the variable "len(x)" with the list lengths and the variable
+    "x[]" with the flattened elements, so both are computed in the same query as
+    the other statistics.
 
-    return df.select(col_vt).columns
+    Args:
+        schema (Mapping[str, pl.DataType]): Maps column names to dtypes.
 
+    Returns:
+        List[Tuple[str, str, pl.Expr, Optional[pl.Expr]]]: For each variable its
+        label, var-type and expression, and for flattened elements the list
+        lengths of the parent, else None.
+    """
+    nested_vars = []
 
-def _map_funs_to_var_type(var_type) -> Tuple[str]:
+    def visit(label, dtype, expr, parent_len):
+        if dtype == pl.Struct:
+            for field in dtype.fields:
+                field_expr = expr.struct.field(field.name)
+                visit(f"{label}.{field.name}", field.dtype, field_expr, parent_len)
+        elif dtype == pl.List:
+            list_len = expr.list.len()
+            visit(f"len({label})", pl.UInt32, list_len, parent_len)
+            # Empty and null lists are dropped, else they would explode to nulls
+            elements = expr.filter(list_len > 0).explode()
+            visit(f"{label}[]", dtype.inner, elements, list_len)
+        else:
+            var_type = _get_var_type_of_dtype(dtype)
+            if var_type is not None:
+                nested_vars.append((label, var_type, expr, parent_len))
+
+    for name, dtype in schema.items():
+        if dtype == pl.Struct or dtype == pl.List:
+            visit(name, dtype, pl.col(name), None)
+
+    return nested_vars
+
+
+def _make_key_exprs(keys: List[str], sep: str) -> dict:
+    """
+    Builds the expressions for the key section.
+
+    The key columns are hashed row-wise into one UInt64 column, so the distinct
+    count is one hash aggregation over 8 bytes per row instead of comparing the
+    tuples. Up to hash collisions, which are negligible for 64 bit hashes, it
+    is exact. The most repeated keys are looked up by their hash and counted
+    again on the tuples, those counts are exact.
+    """
+    hash_name = f"hash{sep}"
+    key_hash = pl.struct(keys).hash(seed=0).alias(hash_name)
+    top_hashes = key_hash.value_counts(sort=True).head(3).struct.field(hash_name)
+    top_3 = (
+        pl.struct(keys)
+        .filter(key_hash.is_in(top_hashes.implode()))
+        .alias(hash_name)
+        .value_counts(sort=True)
+        .head(3)
+        .implode()
+    )
+
+    return {
+        f"keys{sep}n_unique": key_hash.n_unique().alias(f"keys{sep}n_unique"),
+        f"keys{sep}top_3": top_3.alias(f"keys{sep}top_3"),
+    }
+
+
+def _format_key(key: dict) -> str:
+    values = ["null" if v is None else str(v) for v in key.values()]
+    if len(values) == 1:
+        return values[0]
+    return f"({', '.join(values)})"
+
+
+def _map_funs_to_var_type(var_type, table_type: str = "all") -> Tuple[str]:
+    if table_type == "mem":  # Only what the downcast advice needs
+        if var_type in ("num_int", "num_float"):
+            return ("null_count", "min", "max")
+        elif var_type == "cat":
+            return ("null_count", "n_unique")
+        return ("null_count",)
     if var_type in ("num_float", "num_int", "num_bool"):
         return ("null_count", "mean", "std", "median", "min", "max")
     elif var_type == "cat":
@@ -84,7 +357,7 @@ def _map_cols_and_funs_for_var_type(df, var_type) -> Tuple[str]:
 
 def _map_table_type_to_var_types(table_type):
     """Maps table type to var types"""
-    if table_type == "all":
+    if table_type in ("all", "mem"):
         return ("num_float", "num_int", "num_bool", "date", "datetime", "null", "cat")
     elif table_type == "num":
         return ("num_float", "num_int", "num_bool", "null")
@@ -93,7 +366,143 @@ def _map_table_type_to_var_types(table_type):
     elif table_type == "cat":
         return ("cat",)
     else:
-        raise ValueError("""Type must be either "all", "num" "time" or "cat" """)
+        raise ValueError("""Type must be either "all", "num" "time", "cat" or "mem" """)
+
+
+class _Plan(NamedTuple):
+    """Everything _Table derives from the schema, before looking at the data"""
+
+    vars_map: Dict[str, List[str]]  # Maps var-type to columns
+    funs_map: Dict[str, Tuple[str]]  # Maps var-type to functions
+    stat_names_map: Dict[str, List[str]]  # Maps var-type to names of statistics
+    nested_exprs: Dict[str, pl.Expr]  # Maps struct fields and list variables
+    exprs_map: Dict[str, Dict[str, pl.Expr]]  # Maps variable to its expressions
+    column_order: Optional[List[str]]  # Order of the rows if top_cols is given
+
+
+def _get_schema_key(df, from_duckdb: bool) -> tuple:
+    """The schema as a hashable tuple of (name, dtype) pairs"""
+    if from_duckdb:
+        return tuple(zip(df.columns, map(str, df.types)))
+    if isinstance(df, pl.LazyFrame):
+        return tuple(_get_lazy_schema(df).items())
+    return tuple(df.schema.items())
+
+
+@lru_cache(maxsize=_PLAN_CACHE_SIZE)
+def _make_plan(
+    schema_key: tuple,
+    from_duckdb: bool,
+    table_type: str,
+    top_cols: Optional[Tuple[str]],
+    dist: bool,
+    approx: bool,
+    keys: Optional[Tuple[str]],
+    sep: str,
+    str_len: bool = False,
+) -> _Plan:
+    """
+    Classifies the columns and builds the expressions of all statistics.
+
+    This only depends on the schema and the requested statistics, so it is
+    cached: profiling many frames of the same schema classifies them and builds
+    the expressions once.
+    """
+    vars_map = {}
+    funs_map = {}
+    stat_names_map = {}
+    schema = dict(schema_key)
+    # The memory table only advises on top-level columns
+    no_nested = from_duckdb or table_type == "mem"
+    nested_vars = [] if no_nested else _get_nested_vars(schema)
+    nested_exprs = {}
+    list_lens = {}  # Maps flattened list elements to the lengths of the lists
+    for label, _, expr, list_len in nested_vars:
+        nested_exprs[label] = expr
+        if list_len is not None:
+            list_lens[label] = list_len
+    for var_type in _map_table_type_to_var_types(table_type):
+        if from_duckdb:
+            vars_vt = get_duckdb_cols_for_var_type(schema_key, var_type)
+        else:
+            vars_vt = [
+                name
+                for name, dtype in schema_key
+                if _get_var_type_of_dtype(dtype) == var_type
+            ]
+            vars_vt += [label for label, vt, _, _ in nested_vars if vt == var_type]
+        if vars_vt:
+            vars_map[var_type] = vars_vt
+            funs_map[var_type] = _map_funs_to_var_type(var_type, table_type)
+            stat_names_map[var_type] = []
+    exprs_map = {}
+    for vt in vars_map:
+        functions_vt = funs_map[vt]
+        for var in vars_map[vt]:
+            col = nested_exprs.get(var, pl.col(var))
+            list_len = list_lens.get(var)
+            exprs_var = {}
+            for function in functions_vt:
+                stat_name = f"{var}{sep}{function}"
+                if approx and function == "n_unique":
+                    function = "approx_n_unique"  # HyperLogLog
+                expr = getattr(col, function)().alias(stat_name)
+                exprs_var[stat_name] = expr
+                stat_names_map[vt].append(stat_name)
+            if list_len is not None:  # Number of elements, for NA%
+                n_values_name = f"n_values{sep}{var}"
+                exprs_var[n_values_name] = list_len.sum().alias(n_values_name)
+            if dist and vt in _DIST_VAR_TYPES:  # Binned in the same query
+                hist_name = f"hist{sep}{var}"
+                exprs_var[hist_name] = make_hist_expr(col, _N_BINS, hist_name)
+            if vt == "cat" and table_type != "mem":
+                top_3_name = f"top_3{sep}{var}"
+                exprs_var[top_3_name] = (
+                    col.alias(var)
+                    .drop_nulls()
+                    .value_counts(sort=True)
+                    .head(3)
+                    .implode()
+                    .alias(top_3_name)
+                )
+            if vt == "cat" and (str_len or table_type == "mem"):
+                # Lengths from the string views, not the data
+                str_len_name = f"str_len{sep}{var}"
+                exprs_var[str_len_name] = make_str_len_expr(col, str_len_name)
+            if table_type == "mem" and schema.get(var) == pl.Float64:
+                f32_name = f"f32_check{sep}{var}"
+                exprs_var[f32_name] = make_float32_check_expr(col, f32_name)
+            exprs_map[var] = exprs_var
+    # The key section is evaluated in the same query, as a pseudo-variable
+    if keys is not None:
+        exprs_map[f"keys{sep}"] = _make_key_exprs(list(keys), sep)
+    # So are the sizes of the columns the memory table has no statistics for
+    if table_type == "mem":
+        classified = {var for variables in vars_map.values() for var in variables}
+        size_exprs = {
+            f"size{sep}{var}": make_size_expr(pl.col(var), dtype).alias(
+                f"size{sep}{var}"
+            )
+            for var, dtype in schema.items()
+            if var not in classified
+        }
+        if size_exprs:
+            exprs_map[f"size{sep}"] = size_exprs
+    column_order = None
+    if top_cols is not None:  # Put top_cols at front
+        all_columns_in_order = [var for vt in vars_map for var in vars_map[vt]]
+        column_order = list(top_cols) + [
+            var for var in all_columns_in_order if var not in top_cols
+        ]
+
+    return _Plan(
+        vars_map, funs_map, stat_names_map, nested_exprs, exprs_map, column_order
+    )
+
+
+def plan_cache_info():
+    """Hits, misses and size of the cache of classified columns and expressions"""
+    return _make_plan.cache_info()
 
 
 class _Table:
@@ -101,37 +510,215 @@ class _Table:
 
     def __init__(
         self,
-        df: Union[pl.DataFrame, "pandas.DataFrame"],
+        df: Union[
+            pl.DataFrame,
+            pl.LazyFrame,
+            "pandas.DataFrame",
+            str,
+            Path,
+            "duckdb.DuckDBPyRelation",
+        ],
         table_type: str,
         top_cols: Iterable = None,
+        dist: bool = False,
+        backend: str = "auto",
+        approx: bool = False,
+        sample: Optional[int] = None,
+        time_budget_ms: Optional[float] = None,
+        keys: Union[List[str], str, None] = None,
+        columns=None,
+        filter: Optional[pl.Expr] = None,
+        dry_run: bool = False,
+        cache: bool = False,
+        str_len: bool = False,
+        evaluate: bool = True,
     ):
-        df = _check_input_maybe_try_transform(df)
+        if backend not in ("auto", "polars", "numpy"):
+            raise ValueError(f"backend {backend} not supported")
+        from_duckdb = is_duckdb_relation(df)
+        # Deferred statistics are computed by one polars query from make_query
+        if not evaluate and (
+            from_duckdb or backend == "numpy" or time_budget_ms is not None or cache
+        ):
+            raise ValueError(
+                "evaluate=False does not support DuckDB relations, backend numpy, "
+                "time_budget_ms and cache"
+            )
+        if from_duckdb:
+            if dist or time_budget_ms is not None or keys is not None or str_len:
+                raise ValueError(
+                    "dist, time_budget_ms, keys and str_len are not supported for "
+                    "DuckDB relations"
+                )
+            if table_type == "mem":
+                raise ValueError("Type mem is not supported for DuckDB relations")
+            if columns is not None or filter is not None or dry_run:
+                raise ValueError(
+                    "columns, filter and dry_run are not supported for DuckDB relations"
+                )
+        if isinstance(keys, str):
+            keys = [keys]
+        # The footer of a Parquet file holds null counts for the meta stage
+        parquet_path = None
+        is_path = isinstance(df, (str, Path))
+        if is_path and Path(df).suffix.lower() == ".parquet":
+            if filter is None and sample is None:
+                parquet_path = df
+        if not from_duckdb:
+            df = _check_input_maybe_try_transform(df)
+            if columns is not None or filter is not None:
+                df = _select_and_filter(df, columns, filter, keys)
+            if sample is not None:
+                df = _sample_rows(df, sample)
         if isinstance(top_cols, str):
             top_cols = [top_cols]
+        if keys is not None and len(keys) == 0:
+            raise ValueError("keys must contain at least one column")
+        self.keys = keys
         self.type = table_type
         self.stat_dfs = {}
         self.top_cols = top_cols
-        self.num_rows = df.height
-        vars_map = {}  # Maps var-type to columns in df
-        funs_map = {}  # Maps var-type to functions
-        stat_names_map = {}  # Maps var-type to names of computed statistics
-        for var_type in _map_table_type_to_var_types(table_type):
-            vars_vt, funs_vt = _map_cols_and_funs_for_var_type(df, var_type)
-            if vars_vt:
-                vars_map[var_type] = vars_vt
-                funs_map[var_type] = funs_vt
-                stat_names_map[var_type] = []
-        self.funs_map = funs_map
-        expressions = []
-        sep = "____"
-        for vt in vars_map:
-            functions_vt = funs_map[vt]
-            for var in vars_map[vt]:
-                for function in functions_vt:
-                    stat_name = f"{var}{sep}{function}"
-                    expr = getattr(pl.col(var), function)().alias(stat_name)
-                    expressions.append(expr)
-                    stat_names_map[vt].append(stat_name)
+        self.dist = dist
+        self.str_len = str_len
+        self.approx = approx
+        is_lazy = isinstance(df, pl.LazyFrame)
+        self.num_rows = None if is_lazy or from_duckdb else df.height
+        self.backend = backend
+        self.sep = sep = "____"
+        self.key_var = f"keys{sep}"
+        self.size_var = f"size{sep}"
+        schema_key = _get_schema_key(df, from_duckdb)
+        self.dtypes = dict(schema_key)
+        plan = _make_plan(
+            schema_key,
+            from_duckdb,
+            table_type,
+            None if top_cols is None else tuple(top_cols),
+            dist,
+            approx,
+            None if keys is None else tuple(keys),
+            sep,
+            str_len,
+        )
+        # Shared by all tables with this plan, must not be mutated
+        self.vars_map = vars_map = plan.vars_map
+        self.funs_map = funs_map = plan.funs_map
+        self.stat_names_map = plan.stat_names_map
+        self.nested_exprs = plan.nested_exprs
+        self.exprs_map = exprs_map = plan.exprs_map
+        self.column_order = plan.column_order
+        # Small tables are formatted eagerly, see make_dt
+        self.fast_path = sum(map(len, vars_map.values())) <= _FAST_PATH_MAX_VARS
+        # Sizes of the columns in memory, estimated from statistics if lazy
+        self.sizes = None
+        if table_type == "mem" and isinstance(df, pl.DataFrame):
+            self.sizes = {
+                var: df.get_column(var).estimated_size() for var in df.columns
+            }
+        # Sizes measured by estimated_size are not computed in the query
+        variables = [
+            var for var in exprs_map if var != self.size_var or self.sizes is None
+        ]
+        # Precision of each statistic, only tracked in anytime mode
+        self.precision = None
+        self._dry_run_df = df if dry_run else None
+        self._deferred = None
+        if dry_run:  # Only explain() is available
+            return
+        if not evaluate:  # See make_query and set_stats
+            self._deferred = (df, variables)
+            return
+        if from_duckdb:  # Only the result row is pulled into python
+            self.stats, self.num_rows = compute_duckdb_stats(
+                df, vars_map, funs_map, sep, approx, sample
+            )
+        elif time_budget_ms is None and cache and not is_lazy:
+            self.stats, _ = self._evaluate_cached(df, variables)
+        elif time_budget_ms is None:
+            self.stats, num_rows = self._evaluate(df, variables)
+            if is_lazy:
+                self.num_rows = num_rows
+        else:
+            self._evaluate_anytime(df, variables, time_budget_ms, parquet_path)
+        if self.num_rows == 0:
+            raise ValueError("Input data frame must have rows and columns")
+
+    def explain(self) -> str:
+        """
+        Reports the classification, the number of expressions, a rough time and
+        memory estimate per column group and the optimized query plan. Only
+        available with dry_run=True.
+        """
+        if self._dry_run_df is None:
+            raise ValueError("explain() needs a _Table made with dry_run=True")
+        return make_explain_report(self, self._dry_run_df)
+
+    def make_query(self) -> pl.LazyFrame:
+        """
+        The statistics of a _Table made with evaluate=False as one lazy query,
+        so that the queries of several tables can be collected together. The
+        result is passed to set_stats.
+        """
+        if self._deferred is None:
+            raise ValueError("make_query() needs a _Table made with evaluate=False")
+        df, variables = self._deferred
+        expressions = [
+            expr for var in variables for expr in self.exprs_map[var].values()
+        ]
+        len_name = f"len{self.sep}"
+
+        return df.lazy().select(pl.len().alias(len_name), *expressions)
+
+    def set_stats(self, stat_row: pl.DataFrame):
+        """Takes the statistics from the collected result of make_query"""
+        stats = stat_row.row(0, named=True)
+        self.num_rows = stats.pop(f"len{self.sep}")
+        self.stats = stats
+        self._deferred = None
+        if self.num_rows == 0:
+            raise ValueError("Input data frame must have rows and columns")
+
+    def _evaluate(
+        self, df: Union[pl.DataFrame, pl.LazyFrame], variables: Iterable[str]
+    ) -> Tuple[dict, int]:
+        """
+        Computes the statistics of the given variables in one query.
+
+        Returns:
+            Tuple[dict, int]: The statistics keyed by name, and the number of rows
+        """
+        is_lazy = isinstance(df, pl.LazyFrame)
+        num_rows = None if is_lazy else df.height
+        # Plain numeric columns without nulls may go to the numpy backend
+        dense_blocks = {}
+        if self.backend != "polars" and not is_lazy and num_rows > 1:
+            numeric = set(self.vars_map.get("num_float", []))
+            numeric.update(self.vars_map.get("num_int", []))
+            dense_candidates = [
+                var
+                for var in variables
+                if var in numeric and var not in self.nested_exprs
+            ]
+            dense_blocks = get_dense_blocks(df, dense_candidates)
+            n_dense = sum(len(cols) for cols in dense_blocks.values())
+            if self.backend == "auto" and (
+                n_dense < _MIN_DENSE_COLS
+                or num_rows > _MAX_DENSE_ROWS
+                or not _numpy_available()
+            ):
+                dense_blocks = {}
+        dense_stats = {}
+        for cols in dense_blocks.values():
+            dense_stats.update(compute_dense_stats(df, cols, self.sep))
+        expressions = [
+            expr
+            for var in variables
+            for stat_name, expr in self.exprs_map[var].items()
+            if stat_name not in dense_stats
+        ]
+        len_name = f"len{self.sep}"
+        if is_lazy:  # Count rows in the same scan
+            expressions.append(pl.len().alias(len_name))
         # Evaluate expressions
         # Cover special cases.
         # Those conditions must always hold:
@@ -140,22 +727,206 @@ class _Table:
         # (3) Each list in stat_names_mp is sorted by variable name.
         if len(expressions) == 0:
             stats = {}
-        elif "cat" in vars_map:
-            expr = (
-                cs.by_name(vars_map["cat"])
-                .drop_nulls()
-                .value_counts(sort=True)
-                .head(3)
-                .implode()
-                .name.prefix(f"top_3{sep}")
-            )
-            stats = df.select(*expressions, expr).row(0, named=True)
         else:
-            stats = df.select(expressions).row(0, named=True)
-        self.stat_names_map = stat_names_map
+            stat_row = df.select(expressions)
+            if is_lazy:
+                stat_row = stat_row.collect()
+            stats = stat_row.row(0, named=True)
+        if is_lazy:
+            num_rows = stats.pop(len_name)
+        stats.update(dense_stats)
+
+        return stats, num_rows
+
+    def _evaluate_cached(
+        self, df: pl.DataFrame, variables: Iterable[str]
+    ) -> Tuple[dict, int]:
+        """
+        Like _evaluate, but takes the statistics of columns whose buffers were
+        already summarized from the cache, and only aggregates the other ones.
+
+        Struct fields, list variables and the keys are always computed.
+        """
+        stats = {}
+        to_compute = {}  # Maps variable to its cache key, None if not cacheable
+        for var in variables:
+            key = None
+            if var in df.columns and var not in self.nested_exprs:
+                col = df.get_column(var)
+                buffer_key = get_buffer_key(col)
+                if buffer_key is not None:
+                    stat_spec = (tuple(self.exprs_map[var]), self.approx)
+                    key = (var, col.dtype, buffer_key, stat_spec)
+                    cached = get_column_stats(key)
+                    if cached is not None:
+                        stats.update(cached)
+                        continue
+            to_compute[var] = key
+        if to_compute:
+            new_stats, _ = self._evaluate(df, list(to_compute))
+            stats.update(new_stats)
+            for var, key in to_compute.items():
+                if key is not None:
+                    stats_var = {name: new_stats[name] for name in self.exprs_map[var]}
+                    put_column_stats(key, df.get_column(var), stats_var)
+
+        return stats, df.height
+
+    def _evaluate_anytime(
+        self,
+        df: Union[pl.DataFrame, pl.LazyFrame],
+        variables: List[str],
+        time_budget_ms: float,
+        parquet_path: Optional[Union[str, Path]] = None,
+    ):
+        """
+        Computes the statistics stage by stage until the time budget is used up.
+
+        The stages are
+            "meta": Only metadata, i.e. the number of rows and the null counts
+                of data frames and Parquet files. The footer of Parquet files
+                is read with pyarrow if it is already imported or the budget
+                covers its import.
+            "sample": Estimates from a sample of the rows, collected once: a
+                random sample of a data frame, or random slices of a lazy frame,
+                which are read without scanning the other rows. Counts, i.e.
+                null counts, frequencies and total string lengths, are scaled
+                to all rows.
+            "exact": The statistics from all rows.
+        Each stage runs in batches of variables. Before each batch, the remaining
+        time is compared to the extrapolated cost of the batch, stopping early if
+        the batch would overrun the budget. The first batch holds a single
+        variable, which measures the cost per variable. The slices of a lazy
+        frame are only read while half of the remaining time allows. The
+        precision of each statistic is stored in self.precision.
+        """
+        deadline = time.perf_counter() + time_budget_ms / 1000
+        stats = {name: None for var in variables for name in self.exprs_map[var]}
+        precision = dict.fromkeys(stats, "meta")
+        top_3_names = {f"top_3{self.sep}{var}" for var in self.vars_map.get("cat", [])}
+        str_len_names = {
+            f"str_len{self.sep}{var}" for var in self.vars_map.get("cat", [])
+        }
+        count_names = {f"{var}{self.sep}null_count" for var in variables}
+        count_names.update(f"n_values{self.sep}{var}" for var in variables)
+        count_names.update(self.exprs_map.get(self.size_var, {}))
+        stages = []
+        if isinstance(df, pl.LazyFrame):
+            self.num_rows = df.select(pl.len()).collect().item()
+            null_counts = {}
+            if parquet_path is not None and (
+                "pyarrow" in sys.modules or time_budget_ms >= _PYARROW_IMPORT_BUDGET_MS
+            ):
+                null_counts = _read_parquet_null_counts(parquet_path)
+        else:
+            null_counts = df.null_count().row(0, named=True)  # Metadata, no scan
+        for var in variables:
+            if var in self.nested_exprs or var in (self.key_var, self.size_var):
+                continue
+            if var in null_counts:
+                stat_name = f"{var}{self.sep}null_count"
+                stats[stat_name] = null_counts[var]
+                precision[stat_name] = "exact"
+        if self.num_rows > _ANYTIME_SAMPLE_ROWS:
+            if isinstance(df, pl.LazyFrame):
+                # Half of the remaining time is left for the aggregations
+                now = time.perf_counter()
+                sample_df = self._collect_slices(df, now + (deadline - now) / 2)
+            else:
+                sample_df = df.sample(n=_ANYTIME_SAMPLE_ROWS, seed=0)
+            if sample_df is not None:
+                stages.append(("sample", sample_df))
+        # The cost of the exact stage is extrapolated from the sample stage
+        if self.num_rows <= _ANYTIME_SAMPLE_ROWS or stages:
+            stages.append(("exact", df))
+
+        seconds_per_var = None  # Cost estimate for the current stage
+
+        for label, frame in stages:
+            if label == "exact":
+                scale = 1
+            else:
+                scale = self.num_rows / frame.height
+            # Distinct keys of a sample do not extrapolate
+            variables_stage = [
+                var for var in variables if label == "exact" or var != self.key_var
+            ]
+            start = 0
+            while start < len(variables_stage):
+                # Without an estimate, a single variable of at most
+                # _ANYTIME_SAMPLE_ROWS rows is aggregated to measure the cost
+                batch_size = 1 if seconds_per_var is None else _ANYTIME_BATCH_COLS
+                batch = variables_stage[start : start + batch_size]
+                start += batch_size
+                now = time.perf_counter()
+                if now >= deadline or (
+                    seconds_per_var is not None
+                    and now + seconds_per_var * len(batch) > deadline
+                ):
+                    break
+                batch_stats, _ = self._evaluate(frame, batch)
+                seconds_per_var = (time.perf_counter() - now) / len(batch)
+                for stat_name, value in batch_stats.items():
+                    if precision[stat_name] == "exact":
+                        continue
+                    if stat_name in top_3_names and scale != 1:
+                        value = [{**dd, "count": dd["count"] * scale} for dd in value]
+                    elif stat_name in str_len_names and scale != 1:
+                        value = {**value, "bytes": value["bytes"] * scale}
+                    elif stat_name in count_names and value is not None:
+                        value = round(value * scale)
+                    stats[stat_name] = value
+                    precision[stat_name] = label
+            else:
+                if seconds_per_var is not None:
+                    # The next stage scans all rows instead of a sample
+                    seconds_per_var *= scale
+                continue
+            break
+
         self.stats = stats
-        self.vars_map = vars_map
-        self.sep = sep
+        self.precision = precision
+
+    def _collect_slices(
+        self, df: pl.LazyFrame, deadline: float
+    ) -> Optional[pl.DataFrame]:
+        """
+        Reads _ANYTIME_SLICES slices at random offsets of a lazy frame, one after
+        the other while the time per slice so far fits before the deadline.
+
+        Scans push the slices down, so e.g. Parquet files only decode the row
+        groups holding them. Returns None if no slice could be read in time.
+        """
+        slice_rows = _ANYTIME_SAMPLE_ROWS // _ANYTIME_SLICES
+        n_slots = self.num_rows // slice_rows
+        slots = sorted(random.Random(0).sample(range(n_slots), _ANYTIME_SLICES))
+        slices = []
+        start = time.perf_counter()
+        for slot in slots:
+            now = time.perf_counter()
+            seconds_per_slice = (now - start) / len(slices) if slices else 0
+            if now + seconds_per_slice > deadline:
+                break
+            slices.append(df.slice(slot * slice_rows, slice_rows).collect())
+        if not slices:
+            return None
+
+        return pl.concat(slices)
+
+    def _get_precision(self, var: str) -> str:
+        """The lowest precision among the statistics of var"""
+        ranks = {"meta": 0, "sample": 1, "exact": 2}
+        return min(
+            (self.precision[stat_name] for stat_name in self.exprs_map[var]),
+            key=ranks.get,
+        )
+
+    def _get_num_values(self, var: str) -> int:
+        """Number of rows, or number of list elements of a flattened list"""
+        n_values = self.stats.get(f"n_values{self.sep}{var}")
+        if n_values is None:
+            return self.num_rows
+        return max(n_values, 1)
 
     def make_dt(self, var_type: str) -> pl.DataFrame:
         data = {}
@@ -167,61 +938,147 @@ class _Table:
             _, fun_name = name.split(self.sep, 1)
             stat_value = self.stats[name]
             data[fun_name].append(stat_value)
+        if self.dist and var_type in _DIST_VAR_TYPES:
+            data["dist"] = [
+                make_sparkline(self.stats[f"hist{self.sep}{var}"], _N_BINS)
+                for var in self.vars_map[var_type]
+            ]
+        if self.precision is not None:
+            data["precision"] = [
+                self._get_precision(var) for var in self.vars_map[var_type]
+            ]
+
+        # Flattened list elements are counted relative to the number of elements
+        n_values = [self._get_num_values(var) for var in self.vars_map[var_type]]
+
+        if var_type == "num_float":
+            scientific = ("mean", "median", "min", "max", "std")
+        elif var_type in ("num_int", "num_bool"):
+            scientific = ("mean", "median", "std")
+        else:
+            scientific = ()
+        # For small tables, planning the formatting query would dominate
+        format_in_python = self.fast_path and all(
+            value is None or type(value) is float
+            for fun_name in scientific
+            for value in data[fun_name]
+        )
+        if format_in_python:
+            for fun_name in scientific:
+                data[fun_name] = [format_scientific(value) for value in data[fun_name]]
 
-        df = pl.LazyFrame(data)
+        df = pl.DataFrame(data) if self.fast_path else pl.LazyFrame(data)
         df = df.with_columns(
-            pl.col("null_count").truediv(self.num_rows).mul(100).ceil().cast(pl.Int16)
+            pl.col("null_count")
+            .truediv(pl.Series(n_values, dtype=pl.Float64))
+            .mul(100)
+            .ceil()
+            .cast(pl.Int16)
         )
 
         # Some special cases
-        if var_type == "num_float":
-            df = convert_df_scientific(df, ["mean", "median", "min", "max", "std"])
-        elif var_type in ("num_int", "num_bool"):
-            df = convert_df_scientific(df, ["mean", "median", "std"]).with_columns(
-                pl.col("min", "max").cast(pl.String),
-            )
+        if scientific and not format_in_python:
+            df = convert_df_scientific(df, scientific)
+        if var_type in ("num_int", "num_bool"):
+            df = df.with_columns(pl.col("min", "max").cast(pl.String).fill_null(""))
         elif var_type == "date" or var_type == "datetime":
             df = df.select(
                 "Variable",
                 "null_count",
-                pl.col("median", "min", "max").cast(pl.String).str.slice(0, 19),
+                pl.col("median", "min", "max")
+                .cast(pl.String)
+                .str.slice(0, 19)
+                .fill_null(""),
+                *(["dist"] if self.dist else []),
+                *(["precision"] if self.precision is not None else []),
             )
         elif var_type == "null":
-            df = df.with_columns(
+            df = df.select(
+                "Variable",
                 "null_count",
                 pl.lit("").alias("mean"),
                 pl.lit("").alias("std"),
                 pl.lit("").alias("median"),
                 pl.lit("").alias("min"),
                 pl.lit("").alias("max"),
+                *([pl.lit("").alias("dist")] if self.dist else []),
+                *(["precision"] if self.precision is not None else []),
             )
         elif var_type == "cat":
             data = []
-            for var_name in self.vars_map["cat"]:
+            for var_name, n_var in zip(self.vars_map["cat"], n_values):
                 stat_name = f"top_3{self.sep}{var_name}"
                 freq_list = self.stats[stat_name]
                 row = {}
-                for i, dd in enumerate(freq_list):
+                for i, dd in enumerate(freq_list or []):
                     val, count = dd[var_name], dd["count"]
-                    row[f"Top {i+1}"] = f"{val} ({count / self.num_rows:.0%})"
+                    row[f"Top {i + 1}"] = f"{val} ({count / n_var:.0%})"
                 data.append(row)
             right = pl.DataFrame(data).fill_null("")
+            if self.str_len:
+                str_len_df = self.make_str_len_df()
             df = df.select(
                 "Variable",
                 pl.col("null_count").alias("NA%"),
                 pl.col("n_unique").alias("Uniques"),
+                *(["precision"] if self.precision is not None else []),
             )
+            if self.str_len:
+                if not self.fast_path:
+                    str_len_df = str_len_df.lazy()
+                df = pl.concat([df, str_len_df], how="horizontal")
             for col_name in right.columns:
                 column = right.get_column(col_name)
                 df = df.with_columns(column)
-        return df
+        return df.lazy()
+
+    def make_str_len_df(self) -> pl.DataFrame:
+        """Lengths in bytes of the cat variables: min/avg/max, empty share, total"""
+        rows = []
+        for var in self.vars_map["cat"]:
+            dd = self.stats[f"str_len{self.sep}{var}"]
+            row = {"Len": "", "Empty%": "", "Bytes": ""}
+            if dd is not None and dd["n"] > 0:
+                row["Len"] = f"{dd['min']}/{dd['mean']:.1f}/{dd['max']}"
+                row["Empty%"] = str(math.ceil(dd["n_empty"] / dd["n"] * 100))
+                row["Bytes"] = format_bytes(dd["bytes"])
+            rows.append(row)
+
+        return pl.DataFrame(rows, schema=dict.fromkeys(rows[0], pl.String))
+
+    def make_key_df(self) -> pl.DataFrame:
+        """The key section: distinct key tuples, duplicate rate and top keys"""
+        if self.num_rows < 100_000:
+            name_keys = f"Keys N={self.num_rows}"
+        else:
+            name_keys = f"Keys N={Decimal(self.num_rows):.2E}"
+        n_unique = self.stats[f"keys{self.sep}n_unique"]
+        row = {
+            name_keys: ", ".join(self.keys),
+            "Distinct": "" if n_unique is None else str(n_unique),
+            "Dup.%": (
+                ""
+                if n_unique is None
+                else str(math.ceil((self.num_rows - n_unique) / self.num_rows * 100))
+            ),
+        }
+        top_3 = self.stats[f"keys{self.sep}top_3"] or []
+        repeated = [dd for dd in top_3 if dd["count"] > 1]
+        for i, dd in enumerate(repeated):
+            row[f"Top {i + 1}"] = (
+                f"{_format_key(dd[f'hash{self.sep}'])} ({dd['count']}x)"
+            )
+        if self.precision is not None:
+            row["Prec."] = self._get_precision(self.key_var)
+
+        return pl.DataFrame([row])
 
     def form_stat_df(self, table_type):
         """
         Makes the final data frame
         """
-        from decimal import Decimal
-
+        if self.keys is not None and "keys" not in self.stat_dfs:
+            self.stat_dfs["keys"] = self.make_key_df()
         if table_type == "all":
             self.form_stat_df("time")
             self.form_stat_df("num")
@@ -232,6 +1089,9 @@ class _Table:
             name_var = f"Var. N={self.num_rows}"
         else:
             name_var = f"Var. N={Decimal(self.num_rows):.2E}"
+        if table_type == "mem":
+            self.stat_dfs["mem"] = make_mem_df(self, name_var)
+            return
         subdfs = []
 
         for var_type in _map_table_type_to_var_types(table_type):
@@ -251,9 +1111,19 @@ class _Table:
                 pl.col("min").alias("Min"),
                 pl.col("max").alias("Max"),
                 pl.col("median").alias("Median"),
+                *([pl.col("dist").alias("Dist")] if self.dist else []),
+                *(
+                    [pl.col("precision").alias("Prec.")]
+                    if self.precision is not None
+                    else []
+                ),
             )
         elif table_type == "cat":
             stat_df = stat_df.rename({"Variable": name_var})
+            if self.precision is not None:
+                stat_df = stat_df.select(
+                    pl.exclude("precision"), pl.col("precision").alias("Prec.")
+                )
         elif table_type == "time":
             stat_df = stat_df.select(
                 pl.col("Variable").alias(name_var),
@@ -261,35 +1131,25 @@ class _Table:
                 pl.col("min").alias("Min"),
                 pl.col("max").alias("Max"),
                 pl.col("median").alias("Median"),
+                *([pl.col("dist").alias("Dist")] if self.dist else []),
+                *(
+                    [pl.col("precision").alias("Prec.")]
+                    if self.precision is not None
+                    else []
+                ),
             )
 
-        if self.top_cols is not None:  # Put top_cols at front
-            all_columns_in_order = []
-            for vt in self.vars_map:
-                all_columns_in_order.extend(self.vars_map[vt])
-            new_order = self.top_cols + [
-                var for var in all_columns_in_order if var not in self.top_cols
-            ]
+        if self.column_order is not None:  # Put top_cols at front
             stat_df = stat_df.with_columns(
-                pl.col(name_var).cast(pl.Enum(new_order))
+                pl.col(name_var).cast(pl.Enum(self.column_order))
             ).sort(name_var)
 
         self.stat_dfs[table_type] = stat_df.collect()
 
     def show_one_table(self, table_type):
         if table_type in self.stat_dfs:
-            with pl.Config(
-                tbl_hide_dataframe_shape=True,
-                tbl_formatting="NOTHING",
-                tbl_hide_column_data_types=True,
-                float_precision=2,
-                fmt_str_lengths=100,
-                tbl_rows=-1,
-                tbl_cell_alignment="LEFT",
-                set_fmt_float="full",
-                set_tbl_width_chars=80,
-            ):
-                print(self.stat_dfs[table_type])
+            # Formatted from explicit settings, pl.Config is process-global
+            print(render_table(self.stat_dfs[table_type], max_width=80))
         else:
             if table_type == "num":
                 print("No numerical columns found")
@@ -303,11 +1163,15 @@ class _Table:
             lhs = "-Categorical columns"
         elif type_ == "num":
             lhs = "-Numerical columns"
+        elif type_ == "keys":
+            lhs = "-Key columns"
+        elif type_ == "mem":
+            lhs = "-Memory footprint"
         rhs = "-" * (80 - len(lhs))
         print(f"{lhs}{rhs}")
 
     def show(self):
-        if self.type in ("num", "cat", "time"):
+        if self.type in ("num", "cat", "time", "mem"):
             if self.type not in self.stat_dfs:
                 if self.type == "num":
                     print("No numerical columns found")
@@ -323,3 +1187,6 @@ class _Table:
                 if type_ in self.stat_dfs:
                     self.print_header(type_)
                     self.show_one_table(type_)
+        if "keys" in self.stat_dfs:
+            self.print_header("keys")
+            self.show_one_table("keys")
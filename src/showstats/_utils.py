@@ -1,7 +1,10 @@
-from typing import Iterable
+import math
+from typing import Iterable, List
 
 import polars as pl
 
+_SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
 
 def make_scientific(varname, thr):
     var = pl.col(varname)
@@ -73,3 +76,138 @@ def convert_df_scientific(df: pl.LazyFrame, varnames: Iterable[str], thr: int =
         exprs_scient.append(exp_scient)
 
     return df.with_columns(exprs_ex).with_columns(exprs_scient).drop(name_exponents)
+
+
+def _round_2(value: float) -> float:
+    """Rounds like pl.Expr.round(2): scale, round half to even, scale back"""
+    scaled = value * 100.0
+    rounded = float(round(scaled))
+    if rounded == 0:
+        rounded = math.copysign(0.0, scaled)  # Keeps the sign, e.g. "-0.0"
+
+    return rounded / 100.0
+
+
+def format_scientific(value, thr: int = 4) -> str:
+    """
+    Formats one value exactly like convert_df_scientific, without building a
+    query. Used for small tables, where planning the query dominates.
+
+    Args:
+        value (Optional[float]): The value.
+        thr (int): The threshold exponent for using scientific notation.
+
+    Returns:
+        str: The formatted value, empty for null and NaN
+    """
+    if value is None or math.isnan(value):
+        return ""
+    elif math.isinf(value):
+        return "inf" if value > 0 else "-inf"
+    elif value == 0:
+        return "0.0"
+    # Polars computes log10 as ln(x) / ln(10), which is below 6 for 1e6
+    exponent = math.floor(math.log(abs(value)) / math.log(10.0))
+    if exponent <= thr:
+        return repr(_round_2(value))
+
+    return f"{_round_2(value / 10.0**exponent)!r}E{exponent}"
+
+
+def make_hist_expr(column: pl.Expr, n_bins: int, name: str) -> pl.Expr:
+    """
+    Builds an aggregation which bins a column into equal-width bins between its min
+    and max and counts the entries per bin.
+
+    Dates and datetimes are binned on their physical representation, non-finite
+    values and nulls are ignored.
+
+    Args:
+        column (pl.Expr): The column.
+        n_bins (int): The number of bins.
+        name (str): The output name of the expression.
+
+    Returns:
+        pl.Expr: Expression yielding a list of {"bin": ..., "count": ...} structs
+    """
+    var = column.to_physical().cast(pl.Float64)
+    var = var.filter(var.is_finite())
+    lo = var.min()
+    hi = var.max()
+    bin_idx = (
+        var.sub(lo)
+        .truediv(hi - lo)
+        .mul(n_bins)
+        .floor()
+        .clip(0, n_bins - 1)
+        .fill_nan(0)  # All values equal: 0 / 0
+        .cast(pl.UInt32)
+    )
+
+    return bin_idx.alias("bin").value_counts().implode().alias(name)
+
+
+def make_str_len_expr(column: pl.Expr, name: str) -> pl.Expr:
+    """
+    Builds an aggregation of the lengths of strings in bytes.
+
+    The lengths are read from the string views (the offsets in the Arrow
+    layout), so the string data itself is not scanned. Categoricals are cast to
+    strings first. Nulls are ignored.
+
+    Args:
+        column (pl.Expr): The column.
+        name (str): The output name of the expression.
+
+    Returns:
+        pl.Expr: Expression yielding a struct with the fields "min", "mean", "max",
+        "n_empty", "n" (number of strings) and "bytes" (total length)
+    """
+    lengths = column.cast(pl.String).str.len_bytes()
+
+    return pl.struct(
+        lengths.min().alias("min"),
+        lengths.mean().alias("mean"),
+        lengths.max().alias("max"),
+        (lengths == 0).sum().alias("n_empty"),
+        lengths.count().alias("n"),
+        lengths.sum().alias("bytes"),
+    ).alias(name)
+
+
+def format_bytes(n_bytes: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if n_bytes < 1024:
+            return f"{n_bytes:.0f} {unit}"
+        n_bytes /= 1024
+    return f"{n_bytes:.0f} TB"
+
+
+def make_sparkline(bin_counts: List[dict], n_bins: int) -> str:
+    """
+    Renders the output of make_hist_expr as a unicode sparkline.
+
+    Args:
+        bin_counts (List[dict]): Entries {"bin": ..., "count": ...}, bins without
+            entries are empty.
+        n_bins (int): The number of bins.
+
+    Returns:
+        str: One character per bin, empty string if there are no counts.
+    """
+    if not bin_counts:
+        return ""
+    counts = [0] * n_bins
+    for dd in bin_counts:
+        counts[dd["bin"]] = dd["count"]
+    max_count = max(counts)
+    n_levels = len(_SPARK_CHARS)
+    chars = []
+    for count in counts:
+        if count == 0:
+            chars.append(" ")
+        else:
+            level = max(-(-count * n_levels // max_count) - 1, 0)
+            chars.append(_SPARK_CHARS[level])
+
+    return "".join(chars)
@@ -1,9 +1,16 @@
 # Central functions for table making
-from typing import TYPE_CHECKING, Iterable
+from typing import TYPE_CHECKING, Iterable, List, Optional, Sequence, Union
 
 import polars as pl
 
-from showstats.showstats import make_stats_tbl, show_stats
+from showstats.showstats import (
+    apply_downcasts,
+    explain_stats,
+    make_corr_tbl,
+    make_missing_tbl,
+    make_stats_tbl,
+    show_stats,
+)
 
 if TYPE_CHECKING:
     pass
@@ -14,8 +21,88 @@ class StatsFrame:
     def __init__(self, df: pl.DataFrame):
         self._df = df
 
-    def show(self, table_type: str = "all", top_cols: Iterable = None) -> None:
-        show_stats(self._df, table_type, top_cols)
+    def show(
+        self,
+        table_type: str = "all",
+        top_cols: Iterable = None,
+        dist: bool = False,
+        approx: bool = False,
+        sample: Optional[int] = None,
+        time_budget_ms: Optional[float] = None,
+        keys: Union[List[str], str, None] = None,
+        columns: Union[str, pl.Expr, Sequence[Union[str, pl.Expr]], None] = None,
+        filter: Optional[pl.Expr] = None,
+        cache: bool = False,
+        str_len: bool = False,
+    ) -> None:
+        show_stats(
+            self._df,
+            table_type,
+            top_cols,
+            dist=dist,
+            approx=approx,
+            sample=sample,
+            time_budget_ms=time_budget_ms,
+            keys=keys,
+            columns=columns,
+            filter=filter,
+            cache=cache,
+            str_len=str_len,
+        )
 
-    def make_tbl(self, table_type: str = "all", top_cols: Iterable = None) -> None:
-        return make_stats_tbl(self._df, table_type, top_cols)
+    def make_tbl(
+        self,
+        table_type: str = "all",
+        top_cols: Iterable = None,
+        dist: bool = False,
+        approx: bool = False,
+        sample: Optional[int] = None,
+        time_budget_ms: Optional[float] = None,
+        columns: Union[str, pl.Expr, Sequence[Union[str, pl.Expr]], None] = None,
+        filter: Optional[pl.Expr] = None,
+        cache: bool = False,
+        str_len: bool = False,
+    ) -> None:
+        return make_stats_tbl(
+            self._df,
+            table_type,
+            top_cols,
+            dist=dist,
+            approx=approx,
+            sample=sample,
+            time_budget_ms=time_budget_ms,
+            columns=columns,
+            filter=filter,
+            cache=cache,
+            str_len=str_len,
+        )
+
+    def corr(self, method: str = "pearson", top_k: Optional[int] = None):
+        return make_corr_tbl(self._df, method, top_k)
+
+    def downcast(self):
+        return apply_downcasts(self._df)
+
+    def missing(self, table: str = "pairs", top_k: int = 10):
+        return make_missing_tbl(self._df, table, top_k)
+
+    def explain(
+        self,
+        table_type: str = "all",
+        dist: bool = False,
+        approx: bool = False,
+        sample: Optional[int] = None,
+        keys: Union[List[str], str, None] = None,
+        columns: Union[str, pl.Expr, Sequence[Union[str, pl.Expr]], None] = None,
+        filter: Optional[pl.Expr] = None,
+    ) -> str:
+        return explain_stats(
+            self._df,
+            table_type,
+            dist=dist,
+            approx=approx,
+            sample=sample,
+            keys=keys,
+            columns=columns,
+            filter=filter,
+        )
@@ -1,28 +1,100 @@
 # Central functions for table making
-from typing import TYPE_CHECKING, List, Union
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Union
 
 import polars as pl
 
-from showstats._table import _Table
+from showstats._compare import compute_compare_tables, make_compare_df
+from showstats._corr import compute_corr
+from showstats._duckdb import is_duckdb_relation
+from showstats._mem import get_downcasts
+from showstats._missing import compute_null_cooccurrence, compute_null_patterns
+from showstats._render import render_table
+from showstats._table import (
+    _check_input_maybe_try_transform,
+    _get_cols_for_var_type,
+    _map_table_type_to_var_types,
+    _Table,
+)
 
 if TYPE_CHECKING:
+    import duckdb
     import pandas
 
 
 def show_stats(
-    df: Union[pl.DataFrame, "pandas.DataFrame"],
+    df: Union[
+        pl.DataFrame,
+        pl.LazyFrame,
+        "pandas.DataFrame",
+        str,
+        Path,
+        "duckdb.DuckDBPyRelation",
+    ],
     table_type: str = "all",
     top_cols: Union[List[str], str, None] = None,
+    dist: bool = False,
+    approx: bool = False,
+    sample: Optional[int] = None,
+    time_budget_ms: Optional[float] = None,
+    keys: Union[List[str], str, None] = None,
+    columns: Union[str, pl.Expr, Sequence[Union[str, pl.Expr]], None] = None,
+    filter: Optional[pl.Expr] = None,
+    dry_run: bool = False,
+    cache: bool = False,
+    str_len: bool = False,
 ) -> None:
     """
     Print a table of summary statistics for the given DataFrame, configured
     for for optimal readability.
 
     Args:
-        df (Union[pl.DataFrame, pandas.DataFrame]): The input DataFrame.
+        df (Union[pl.DataFrame, pl.LazyFrame, pandas.DataFrame, str, Path,
+            duckdb.DuckDBPyRelation]): The input DataFrame, or the path to an
+            Arrow IPC, Parquet or CSV file. Lazy frames and files are scanned,
+            reading only the columns needed. A duckdb.DuckDBPyRelation is
+            summarized by one SQL query inside DuckDB.
         top_cols (Union[List[str], str, None], optional): Column or list of columns
             that should appear at the top of the summary table. Defaults to None.
-        table_type (str): All variables (default) = "num" or categorical = "cat"
+        dist (bool): Add a column "Dist" with a histogram sparkline to the num and
+            time tables. Defaults to False.
+        approx (bool): Count distinct values of categorical columns with
+            HyperLogLog instead of exactly. Defaults to False.
+        sample (Optional[int]): Compute statistics on a random sample of this many
+            rows. Defaults to None, which uses all rows.
+        time_budget_ms (Optional[float]): Return the best table that can be
+            computed within this many milliseconds: statistics are refined from
+            metadata over estimates from a sample to exact values, and a column
+            "Prec." tags the precision of each row. Defaults to None, which
+            computes exact statistics without time limit.
+        keys (Union[List[str], str, None]): Column or list of columns forming a
+            key. Adds a section with the number of distinct key tuples, the share
+            of rows repeating a key and the most repeated keys, computed from a
+            64 bit hash of the key columns in the same query. Defaults to None.
+        columns (Union[str, pl.Expr, Sequence[Union[str, pl.Expr]], None]): Names,
+            regular expressions like "^price_.*$" or selectors of the columns to
+            profile. Defaults to None, which profiles all columns.
+        filter (Optional[pl.Expr]): Only profile the rows for which this
+            expression is true. Defaults to None.
+            For lazy frames and files, columns and filter are pushed into the
+            scan.
+        dry_run (bool): Print the classification of the columns, the number of
+            expressions, a rough time and memory estimate per column group and
+            the optimized query plan instead of computing the statistics.
+            Defaults to False.
+        cache (bool): Reuse the statistics of columns of data frames that were
+            already summarized with cache=True, e.g. before a with_columns, and
+            only compute new or modified columns. Columns are identified by
+            their buffers; the cache keeps references to the last 256 columns
+            until showstats.clear_stats_cache() is called.
+            Defaults to False.
+        str_len (bool): Add the columns "Len" (min/avg/max length in bytes),
+            "Empty%" (share of empty strings) and "Bytes" (total length) to the
+            cat table, from the string lengths without reading the string data.
+            Defaults to False.
+        table_type (str): All variables (default) = "num" or categorical = "cat",
+            or "mem" for the memory footprint of each column, its narrowest safe
+            dtype and the projected savings
     Raises:
         ValueError: If the input DataFrame has no rows or columns.
 
@@ -33,28 +105,94 @@ def show_stats(
         - Percentage of missing values is grouped into categories for easier interpretation.
         - Datetime columns are formatted as strings in the output.
     """
-    if table_type not in ("num", "cat", "all", "time"):
+    if table_type not in ("num", "cat", "all", "time", "mem"):
         raise ValueError(f"table_type {table_type} not supported")
 
-    _table = _Table(df, table_type, top_cols)
+    _table = _Table(
+        df,
+        table_type,
+        top_cols,
+        dist,
+        approx=approx,
+        sample=sample,
+        time_budget_ms=time_budget_ms,
+        keys=keys,
+        columns=columns,
+        filter=filter,
+        dry_run=dry_run,
+        cache=cache,
+        str_len=str_len,
+    )
+    if dry_run:
+        print(_table.explain())
+        return
     _table.form_stat_df(table_type)
     _table.show()
 
 
 def make_stats_tbl(
-    df: Union[pl.DataFrame, "pandas.DataFrame"],
+    df: Union[
+        pl.DataFrame,
+        pl.LazyFrame,
+        "pandas.DataFrame",
+        str,
+        Path,
+        "duckdb.DuckDBPyRelation",
+    ],
     table_type: str = "num",
     top_cols: Union[List[str], str, None] = None,
+    dist: bool = False,
+    approx: bool = False,
+    sample: Optional[int] = None,
+    time_budget_ms: Optional[float] = None,
+    columns: Union[str, pl.Expr, Sequence[Union[str, pl.Expr]], None] = None,
+    filter: Optional[pl.Expr] = None,
+    cache: bool = False,
+    str_len: bool = False,
 ) -> None:
     """
     Builds table of summary statistics for the given DataFrame, configured
     for for optimal readability.
 
     Args:
-        df (Union[pl.DataFrame, pandas.DataFrame]): The input DataFrame.
+        df (Union[pl.DataFrame, pl.LazyFrame, pandas.DataFrame, str, Path,
+            duckdb.DuckDBPyRelation]): The input DataFrame, or the path to an
+            Arrow IPC, Parquet or CSV file. Lazy frames and files are scanned,
+            reading only the columns needed. A duckdb.DuckDBPyRelation is
+            summarized by one SQL query inside DuckDB.
         top_cols (Union[List[str], str, None], optional): Column or list of columns
             that should appear at the top of the summary table. Defaults to None.
-        type (str): All variables (default) = "num" or categorical = "cat"
+        dist (bool): Add a column "Dist" with a histogram sparkline to the num and
+            time tables. Defaults to False.
+        approx (bool): Count distinct values of categorical columns with
+            HyperLogLog instead of exactly. Defaults to False.
+        sample (Optional[int]): Compute statistics on a random sample of this many
+            rows. Defaults to None, which uses all rows.
+        time_budget_ms (Optional[float]): Return the best table that can be
+            computed within this many milliseconds: statistics are refined from
+            metadata over estimates from a sample to exact values, and a column
+            "Prec." tags the precision of each row. Defaults to None, which
+            computes exact statistics without time limit.
+        columns (Union[str, pl.Expr, Sequence[Union[str, pl.Expr]], None]): Names,
+            regular expressions like "^price_.*$" or selectors of the columns to
+            profile. Defaults to None, which profiles all columns.
+        filter (Optional[pl.Expr]): Only profile the rows for which this
+            expression is true. Defaults to None.
+            For lazy frames and files, columns and filter are pushed into the
+            scan.
+        cache (bool): Reuse the statistics of columns of data frames that were
+            already summarized with cache=True, e.g. before a with_columns, and
+            only compute new or modified columns. Columns are identified by
+            their buffers; the cache keeps references to the last 256 columns
+            until showstats.clear_stats_cache() is called.
+            Defaults to False.
+        str_len (bool): Add the columns "Len" (min/avg/max length in bytes),
+            "Empty%" (share of empty strings) and "Bytes" (total length) to the
+            cat table, from the string lengths without reading the string data.
+            Defaults to False.
+        type (str): All variables (default) = "num" or categorical = "cat",
+            or "mem" for the memory footprint of each column, its narrowest safe
+            dtype and the projected savings
     Raises:
         ValueError: If the input DataFrame has no rows or columns.
 
@@ -65,8 +203,289 @@ def make_stats_tbl(
         - Percentage of missing values is grouped into categories for easier interpretation.
         - Datetime columns are formatted as strings in the output.
     """
-    if table_type not in ("num", "cat", "all", "time"):
+    if table_type not in ("num", "cat", "all", "time", "mem"):
         raise ValueError(f"Type {table_type} not supported")
-    _table = _Table(df, table_type, top_cols)
+    _table = _Table(
+        df,
+        table_type,
+        top_cols,
+        dist,
+        approx=approx,
+        sample=sample,
+        time_budget_ms=time_budget_ms,
+        columns=columns,
+        filter=filter,
+        cache=cache,
+        str_len=str_len,
+    )
     _table.form_stat_df(table_type)
     return _table.stat_dfs[table_type]
+
+
+def explain_stats(
+    df: Union[pl.DataFrame, pl.LazyFrame, "pandas.DataFrame", str, Path],
+    table_type: str = "all",
+    dist: bool = False,
+    approx: bool = False,
+    sample: Optional[int] = None,
+    keys: Union[List[str], str, None] = None,
+    columns: Union[str, pl.Expr, Sequence[Union[str, pl.Expr]], None] = None,
+    filter: Optional[pl.Expr] = None,
+) -> str:
+    """
+    Describes what show_stats would compute, without computing it.
+
+    Only the number of rows is queried, which for Parquet and IPC files comes
+    from the metadata.
+
+    Args:
+        df (Union[pl.DataFrame, pl.LazyFrame, pandas.DataFrame, str, Path]): The
+            input DataFrame, or the path to an Arrow IPC, Parquet or CSV file.
+        table_type (str): "all" (default), "num", "cat", "time" or "mem".
+        dist, approx, sample, keys, columns, filter: As for show_stats.
+
+    Returns:
+        str: The classification of the columns into var types, the number of
+        expressions, a rough time and memory estimate per column group (exact
+        median, n_unique and value_counts being the expensive parts) and the
+        optimized query plan
+    """
+    if table_type not in ("num", "cat", "all", "time", "mem"):
+        raise ValueError(f"table_type {table_type} not supported")
+    _table = _Table(
+        df,
+        table_type,
+        dist=dist,
+        approx=approx,
+        sample=sample,
+        keys=keys,
+        columns=columns,
+        filter=filter,
+        dry_run=True,
+    )
+    return _table.explain()
+
+
+def make_corr_tbl(
+    df: Union[pl.DataFrame, pl.LazyFrame, "pandas.DataFrame", str, Path],
+    method: str = "pearson",
+    top_k: Optional[int] = None,
+) -> pl.DataFrame:
+    """
+    Builds the correlation matrix of the numeric columns of the given DataFrame.
+
+    The columns are those of the "num" table. The matrix is computed from blocked
+    Gram-matrix products over chunks of rows, so memory stays bounded for frames
+    with thousands of columns. Requires numpy.
+
+    Args:
+        df (Union[pl.DataFrame, pl.LazyFrame, pandas.DataFrame, str, Path]): The
+            input DataFrame, or the path to an Arrow IPC, Parquet or CSV file.
+        method (str): "pearson" (default) or "spearman". Nulls and NaN are
+            dropped pairwise. For "spearman", each column is ranked once over
+            all its non-null values, so with nulls the result differs slightly
+            from ranking the pairwise complete rows, as pandas does.
+        top_k (Optional[int]): Return only the top_k pairs with the largest
+            absolute correlation, sorted descending. Defaults to None, which
+            returns the full matrix.
+    Raises:
+        ValueError: If the input has fewer than 2 numeric columns.
+
+    Returns:
+        pl.DataFrame: The matrix with a first column "Variable", or the pairs with
+        columns "Var. 1", "Var. 2", "Corr." and "N" (number of complete pairs)
+    """
+    df = _check_input_maybe_try_transform(df)
+    cols = []
+    for var_type in _map_table_type_to_var_types("num"):
+        if var_type != "null":  # No variance
+            cols.extend(_get_cols_for_var_type(df, var_type))
+    if len(cols) < 2:
+        raise ValueError("Correlations need at least 2 numeric columns")
+    if isinstance(df, pl.LazyFrame):
+        df = df.select(cols).collect()
+
+    return compute_corr(df, cols, method, top_k)
+
+
+def make_missing_tbl(
+    df: Union[pl.DataFrame, pl.LazyFrame, "pandas.DataFrame", str, Path],
+    table: str = "pairs",
+    top_k: int = 10,
+) -> pl.DataFrame:
+    """
+    Builds a table of the columns that are missing together.
+
+    Only columns with at least one null are included, so the cost grows with
+    the number of incomplete columns and not with the width of the frame.
+    The "pairs" table requires numpy.
+
+    Args:
+        df (Union[pl.DataFrame, pl.LazyFrame, pandas.DataFrame, str, Path]): The
+            input DataFrame, or the path to an Arrow IPC, Parquet or CSV file.
+        table (str): "pairs" (default) for the matrix of the number of rows in
+            which both columns are null, with the null counts on the diagonal, or
+            "patterns" for the most frequent combinations of null columns per row.
+        top_k (int): Number of patterns. Defaults to 10.
+    Raises:
+        ValueError: If table is not supported or the input has no rows.
+
+    Returns:
+        pl.DataFrame: The matrix with a first column "Variable", or the patterns
+        with columns "Null columns", "N" and "%"
+    """
+    if table not in ("pairs", "patterns"):
+        raise ValueError(f"table {table} not supported")
+    if top_k < 1:
+        raise ValueError("top_k must be a positive number of patterns")
+    df = _check_input_maybe_try_transform(df)
+    null_counts = df.select(pl.len(), pl.all().null_count())
+    if isinstance(df, pl.LazyFrame):
+        null_counts = null_counts.collect()
+    num_rows, *counts = null_counts.row(0)
+    if num_rows == 0:
+        raise ValueError("Input data frame must have rows and columns")
+    cols = [col for col, count in zip(null_counts.columns[1:], counts) if count > 0]
+    if isinstance(df, pl.LazyFrame):
+        df = df.select(cols).collect()
+    if table == "pairs":
+        return compute_null_cooccurrence(df, cols)
+
+    return compute_null_patterns(df, cols, top_k, num_rows)
+
+
+def apply_downcasts(
+    df: Union[pl.DataFrame, pl.LazyFrame, "pandas.DataFrame", str, Path],
+) -> Union[pl.DataFrame, pl.LazyFrame]:
+    """
+    Casts each column to the narrowest dtype that holds its values, as advised by
+    the "mem" table.
+
+    Integers are narrowed to the smallest type of the same signedness, Float64
+    to Float32 if all values round-trip within a relative error of 1e-6, and
+    strings to Categorical if at most half of the values are distinct.
+
+    Args:
+        df (Union[pl.DataFrame, pl.LazyFrame, pandas.DataFrame, str, Path]): The
+            input DataFrame, or the path to an Arrow IPC, Parquet or CSV file.
+
+    Returns:
+        Union[pl.DataFrame, pl.LazyFrame]: The frame with the narrowed columns,
+        lazy for lazy frames and files
+    """
+    df = _check_input_maybe_try_transform(df)
+    downcasts = get_downcasts(_Table(df, "mem"))
+
+    return df.with_columns(pl.col(col).cast(dtype) for col, dtype in downcasts.items())
+
+
+def make_compare_tbl(
+    frames: Dict[str, Union[pl.DataFrame, pl.LazyFrame, "pandas.DataFrame", str, Path]],
+    table_type: str = "num",
+    top_cols: Union[List[str], str, None] = None,
+    approx: bool = False,
+    sample: Optional[int] = None,
+    columns: Union[str, pl.Expr, Sequence[Union[str, pl.Expr]], None] = None,
+    filter: Optional[pl.Expr] = None,
+) -> Optional[pl.DataFrame]:
+    """
+    Builds a table comparing the summary statistics of several frames, e.g. the
+    train, test and holdout splits of a data set.
+
+    The statistics of all frames are computed together, collecting one query
+    per frame in parallel with pl.collect_all.
+
+    Args:
+        frames (Dict[str, Union[pl.DataFrame, pl.LazyFrame, pandas.DataFrame,
+            str, Path]]): The frames to compare by name, at least two. The first
+            frame is the reference for the deltas.
+        table_type (str): "num" (default), "cat" or "time".
+        top_cols, approx, sample, columns, filter: As in show_stats, applied to
+            each frame.
+    Raises:
+        ValueError: If fewer than two frames are given, table_type is not
+            supported or a frame has no rows.
+
+    Returns:
+        Optional[pl.DataFrame]: The variables of all frames, with a column group
+        per frame, e.g. "Avg train" and "Avg test", followed by the deltas to the
+        first frame, e.g. "ΔAvg test". None if no frame has variables of this
+        type.
+    """
+    if table_type not in ("num", "cat", "time"):
+        raise ValueError(f"table_type {table_type} not supported")
+    tables = _make_compare_tables(
+        frames, table_type, top_cols, approx, sample, columns, filter
+    )
+
+    return make_compare_df(tables, table_type)
+
+
+def show_stats_compare(
+    frames: Dict[str, Union[pl.DataFrame, pl.LazyFrame, "pandas.DataFrame", str, Path]],
+    table_type: str = "all",
+    top_cols: Union[List[str], str, None] = None,
+    approx: bool = False,
+    sample: Optional[int] = None,
+    columns: Union[str, pl.Expr, Sequence[Union[str, pl.Expr]], None] = None,
+    filter: Optional[pl.Expr] = None,
+) -> None:
+    """
+    Print the summary statistics of several frames side by side, with the
+    deltas to the first frame, e.g. show_stats_compare({"train": a, "test": b}).
+
+    Args:
+        frames (Dict[str, Union[pl.DataFrame, pl.LazyFrame, pandas.DataFrame,
+            str, Path]]): The frames to compare by name, at least two. The first
+            frame is the reference for the deltas.
+        table_type (str): "all" (default), "num", "cat" or "time".
+        top_cols, approx, sample, columns, filter: As in show_stats, applied to
+            each frame.
+    Raises:
+        ValueError: If fewer than two frames are given, table_type is not
+            supported or a frame has no rows.
+    """
+    if table_type not in ("num", "cat", "all", "time"):
+        raise ValueError(f"table_type {table_type} not supported")
+    tables = _make_compare_tables(
+        frames, table_type, top_cols, approx, sample, columns, filter
+    )
+    reference = next(iter(tables.values()))
+    table_types = ("time", "num", "cat") if table_type == "all" else (table_type,)
+    for type_ in table_types:
+        compare_df = make_compare_df(tables, type_)
+        if compare_df is None:
+            if type_ == "num" and table_type != "all":
+                print("No numerical columns found")
+            elif type_ == "cat" and table_type != "all":
+                print("No categorical columns found")
+            elif type_ == "time" and table_type != "all":
+                print("No date or datetime columns found")
+            continue
+        # The frame names go into a second header line
+        compare_df = compare_df.rename(
+            {name: "\n".join(name.rsplit(" ", 1)) for name in compare_df.columns}
+        )
+        reference.print_header(type_)
+        # A column group per frame does not fit into 80 characters, 80 per frame
+        print(render_table(compare_df, max_width=80 * len(tables)))
+
+
+def _make_compare_tables(
+    frames, table_type, top_cols, approx, sample, columns, filter
+) -> Dict[str, _Table]:
+    if len(frames) < 2:
+        raise ValueError("frames must contain at least two frames")
+    for df in frames.values():
+        if is_duckdb_relation(df):
+            raise ValueError("DuckDB relations are not supported for comparisons")
+
+    return compute_compare_tables(
+        frames,
+        table_type,
+        top_cols=top_cols,
+        approx=approx,
+        sample=sample,
+        columns=columns,
+        filter=filter,
+    )
@@ -0,0 +1,63 @@
+import json
+import os
+import subprocess
+import sys
+
+import showstats
+from showstats._cli import main
+
+
+def test_cli(sample_df, tmp_path, capsys):
+    path = tmp_path / "df.parquet"
+    sample_df.write_parquet(path)
+
+    assert main([str(path), "--type", "num", "--top-cols", "U"]) == 0
+    captured = capsys.readouterr()
+    assert captured.out.startswith("-Numerical columns")
+    assert captured.out.splitlines()[2].startswith(" U ")
+
+    assert main([str(path), "--format", "json", "--approx", "--sample", "100"]) == 0
+    tables = json.loads(capsys.readouterr().out)
+    assert sorted(tables) == ["cat", "num", "time"]
+    assert "Var. N=100" in tables["num"][0]
+
+    assert main([str(path), "--type", "cat", "--format", "csv"]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0] == "Var. N=500,NA%,Uniques,Top 1,Top 2,Top 3"
+    assert len(lines) == 4
+    assert main([str(path), "--type", "cat", "--format", "csv", "--str-len"]) == 0
+    header = capsys.readouterr().out.splitlines()[0]
+    assert header == "Var. N=500,NA%,Uniques,Len,Empty%,Bytes,Top 1,Top 2,Top 3"
+
+    args = [str(path), "--format", "json", "--columns", "^float_.*$", "int_col"]
+    assert main([*args, "--filter", "int_col < 50"]) == 0
+    tables = json.loads(capsys.readouterr().out)
+    assert list(tables) == ["num"]
+    assert "Var. N=50" in tables["num"][0]
+
+    assert main([str(path), "--type", "mem"]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].startswith("-Memory footprint")
+    assert lines[-1].startswith(" Total ")
+
+    assert main([str(tmp_path / "missing.parquet")]) == 1
+    assert "error" in capsys.readouterr().err
+
+
+def test_cli_imports(sample_df, tmp_path):
+    path = tmp_path / "df.arrow"
+    sample_df.write_ipc(path)
+    code = (
+        "import sys\n"
+        "from showstats._cli import main\n"
+        f"main([{str(path)!r}, '--dist'])\n"
+        "assert 'numpy' not in sys.modules, 'numpy'\n"
+        "assert 'pandas' not in sys.modules, 'pandas'\n"
+    )
+    src = os.path.dirname(os.path.dirname(showstats.__file__))
+    env = {**os.environ, "PYTHONPATH": src}
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, env=env
+    )
+    assert result.returncode == 0, result.stderr
+    assert "-Numerical columns" in result.stdout
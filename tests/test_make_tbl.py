@@ -1,5 +1,17 @@
+import numpy as np
 import polars as pl
-from showstats.showstats import make_stats_tbl
+import pytest
+from polars.testing import assert_frame_equal
+from showstats._corr import compute_corr
+from showstats._missing import compute_null_cooccurrence
+from showstats._utils import format_bytes
+from showstats.showstats import (
+    apply_downcasts,
+    make_compare_tbl,
+    make_corr_tbl,
+    make_missing_tbl,
+    make_stats_tbl,
+)
 
 
 def test_make_stats_tbl(sample_df):
@@ -7,3 +19,208 @@ def test_make_stats_tbl(sample_df):
     assert isinstance(res_num, pl.DataFrame)
     res_cat = make_stats_tbl(sample_df, "cat")
     assert isinstance(res_cat, pl.DataFrame)
+
+
+def test_make_corr_tbl(sample_df):
+    pd = pytest.importorskip("pandas")
+    corr = make_corr_tbl(sample_df)
+    cols = corr.get_column("Variable").to_list()
+    assert "null_col" not in cols and "str_col" not in cols
+    expected = sample_df.select(cols).to_pandas().corr().to_numpy()
+    np.testing.assert_allclose(corr.drop("Variable").to_numpy(), expected, atol=1e-6)
+
+    # Blocks and chunks smaller than the frame, with pairwise missing values
+    df = sample_df.select(cols).with_columns(
+        pl.when(pl.int_range(pl.len()) % 3 == 0)
+        .then(None)
+        .otherwise(pl.col("U"))
+        .alias("U")
+    )
+    expected = df.to_pandas().corr().to_numpy()
+    res = compute_corr(df, cols, block_cols=3, chunk_rows=7)
+    np.testing.assert_allclose(res.drop("Variable").to_numpy(), expected, atol=1e-6)
+
+    # Without nulls, as pandas ranks the pairwise complete rows
+    complete_cols = [c for c in cols if sample_df[c].null_count() == 0]
+    df_complete = sample_df.select(complete_cols)
+    spearman = df_complete.stats.corr("spearman")
+    expected = pd.DataFrame(df_complete.to_numpy()).corr("spearman").to_numpy()
+    np.testing.assert_allclose(
+        spearman.drop("Variable").to_numpy(), expected, atol=1e-6
+    )
+
+    # With nulls, the ranks of each column's own values correlated pairwise
+    spearman = compute_corr(df, cols, "spearman", block_cols=3, chunk_rows=7)
+    expected = df.to_pandas().rank().corr().to_numpy()
+    np.testing.assert_allclose(
+        spearman.drop("Variable").to_numpy(), expected, atol=1e-6
+    )
+
+    top = make_corr_tbl(sample_df, top_k=3)
+    assert top.columns == ["Var. 1", "Var. 2", "Corr.", "N"]
+    assert top.height == 3
+    abs_corr = top.get_column("Corr.").abs()
+    assert abs_corr.equals(abs_corr.sort(descending=True))
+    upper = corr.drop("Variable").to_numpy()[np.triu_indices(len(cols), k=1)]
+    assert abs_corr[0] == pytest.approx(np.nanmax(np.abs(upper)))
+    top = compute_corr(df, cols, top_k=3, block_cols=2, chunk_rows=7)
+    assert top.get_column("Corr.").abs()[0] == pytest.approx(np.nanmax(np.abs(upper)))
+
+    with pytest.raises(ValueError):
+        make_corr_tbl(sample_df, method="kendall")
+    with pytest.raises(ValueError):
+        make_corr_tbl(sample_df.select("str_col", "int_col"))
+
+
+def test_make_missing_tbl(sample_df):
+    pairs = make_missing_tbl(sample_df)
+    cols = ["bool_col", "str_col", "null_col", "int_with_missings"]
+    assert pairs.get_column("Variable").to_list() == cols
+    for i, col_i in enumerate(cols):
+        for col_j in cols:
+            expected = sample_df.filter(
+                pl.col(col_i).is_null() & pl.col(col_j).is_null()
+            ).height
+            assert pairs.get_column(col_j)[i] == expected
+    assert_frame_equal(compute_null_cooccurrence(sample_df, cols, chunk_rows=7), pairs)
+
+    # More than 64 columns are packed into several words per row
+    rng = np.random.default_rng(1)
+    wide = pl.DataFrame(
+        {f"x_{i}": np.where(rng.random(200) < 0.1, None, 1.0) for i in range(70)}
+    ).with_columns(x_69=pl.when(pl.col("x_0").is_null()).then(None).otherwise(1.0))
+    patterns = wide.stats.missing("patterns", top_k=200)
+    assert patterns.get_column("N").sum() == wide.height
+    assert patterns.get_column("N").is_sorted(descending=True)
+    row = wide.with_row_index().filter(pl.col("x_0").is_null()).row(0, named=True)
+    null_cols = ", ".join(col for col, value in row.items() if value is None)
+    assert null_cols in patterns.get_column("Null columns").to_list()
+    lazy = make_missing_tbl(wide.lazy(), "patterns", top_k=200)
+    assert_frame_equal(lazy, patterns)
+    with pytest.raises(ValueError):
+        make_missing_tbl(sample_df, "triples")
+
+
+def test_mem_tbl_and_downcasts():
+    n = 1_000
+    index = pl.int_range(n)
+    df = pl.select(
+        i16=index - 500,
+        u8=index.cast(pl.UInt32) % 200,
+        i64=pl.repeat(2**40, n, dtype=pl.Int64),
+        f32=index / 3,
+        f64=pl.when(index == 0).then(1e300).otherwise(1.0),
+        cat=pl.format("category_{}", index % 5),
+        ids=pl.format("id_{}", index),
+    )
+    res = make_stats_tbl(df, "mem")
+    assert res.columns == ["Var. N=1000", "Dtype", "Size", "Downcast"] + [
+        "New size",
+        "Saved%",
+    ]
+    downcasts = dict(zip(res.get_column("Var. N=1000"), res.get_column("Downcast")))
+    assert downcasts == {
+        "i16": "Int16",
+        "u8": "UInt8",
+        "i64": "",
+        "f32": "Float32",
+        "f64": "",
+        "cat": "Categorical",
+        "ids": "",
+        "Total": "",
+    }
+    row = res.row(by_predicate=pl.col("Var. N=1000") == "i16")
+    assert row == ("i16", "Int64", "8 KB", "Int16", "2 KB", "75")
+    assert_frame_equal(make_stats_tbl(df.lazy(), "mem"), res)
+
+    narrowed = apply_downcasts(df)
+    assert narrowed.schema["i16"] == pl.Int16 and narrowed.schema["u8"] == pl.UInt8
+    assert narrowed.schema["cat"] == pl.Categorical
+    assert narrowed.estimated_size() < df.estimated_size()
+    assert_frame_equal(narrowed.cast(df.schema), df, check_exact=False, rel_tol=1e-6)
+    assert_frame_equal(df.stats.downcast(), narrowed)
+    assert_frame_equal(apply_downcasts(df.lazy()).collect(), narrowed)
+
+
+def test_mem_tbl_other_dtypes():
+    # Columns without downcast advice are listed and count towards the total
+    n = 1_000
+    df = pl.DataFrame(
+        {
+            "i": range(n),
+            "l": [[1, 2, 3], None] * (n // 2),
+            "b": [b"x" * 20] * n,
+            "d": pl.Series([1, None] * (n // 2), dtype=pl.Duration),
+            "s": [{"a": 1, "b": "xy"}] * n,
+        }
+    )
+    res = make_stats_tbl(df, "mem")
+    assert res.get_column("Var. N=1000").to_list() == [
+        "i",
+        "l",
+        "b",
+        "d",
+        "s",
+        "Total",
+    ]
+    assert res.get_column("Downcast").to_list() == ["Int16"] + [""] * 5
+    total = res.row(by_predicate=pl.col("Var. N=1000") == "Total", named=True)
+    assert total["Size"] == format_bytes(df.estimated_size())
+    assert total["Saved%"] == str(round(6_000 / df.estimated_size() * 100))
+    # Lazy frames estimate the sizes in the same query
+    res_lazy = make_stats_tbl(df.lazy(), "mem")
+    for row, row_lazy in zip(res.iter_rows(), res_lazy.iter_rows()):
+        assert row[:2] == row_lazy[:2]
+        assert row_lazy[2] != "0 B"
+
+
+def test_make_compare_tbl(sample_df):
+    train = sample_df.head(300)
+    test = sample_df.tail(200)
+    compare_df = make_compare_tbl({"train": train, "test": test.lazy()})
+    assert compare_df.columns[0] == "Var. N=300/200"
+    assert compare_df.columns[1:5] == [
+        "NA% train",
+        "Avg train",
+        "SD train",
+        "Median train",
+    ]
+    assert "ΔAvg test" in compare_df.columns
+    # Each column group equals the table of its frame alone
+    for name, df in (("train", train), ("test", test)):
+        stats_df = make_stats_tbl(df)
+        group = compare_df.select(
+            pl.col(compare_df.columns[0]).alias(stats_df.columns[0]),
+            *(
+                pl.col(f"{col} {name}").alias(col)
+                for col in ("NA%", "Avg", "SD", "Median")
+            ),
+        )
+        assert_frame_equal(
+            group,
+            stats_df.select(
+                stats_df.columns[0],
+                pl.col("NA%").cast(pl.String),
+                "Avg",
+                "SD",
+                "Median",
+            ),
+        )
+    row = compare_df.row(
+        compare_df.get_column(compare_df.columns[0]).to_list().index("int_col"),
+        named=True,
+    )
+    delta = test.get_column("int_col").mean() - train.get_column("int_col").mean()
+    assert float(row["ΔAvg test"]) == pytest.approx(delta, rel=1e-2)
+    # Variables of only one frame have empty cells in the other groups
+    compare_df = make_compare_tbl(
+        {"a": train.select("int_col"), "b": test.select("int_col", "float_col")}
+    )
+    assert compare_df.row(1) == ("float_col", "", "", "", "") + compare_df.row(1)[5:]
+    assert compare_df.get_column("ΔAvg b").to_list()[1] == ""
+    cat_df = make_compare_tbl({"a": train, "b": test}, "cat")
+    assert "Uniques b" in cat_df.columns and "ΔUniques b" in cat_df.columns
+    with pytest.raises(ValueError):
+        make_compare_tbl({"train": train})
+    with pytest.raises(ValueError):
+        make_compare_tbl({"a": train, "b": test}, "mem")
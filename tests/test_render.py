@@ -0,0 +1,75 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import polars as pl
+from showstats._render import _get_width, render_table
+from showstats._table import _Table
+
+
+def render_with_config(df):
+    with pl.Config(
+        tbl_hide_dataframe_shape=True,
+        tbl_formatting="NOTHING",
+        tbl_hide_column_data_types=True,
+        float_precision=2,
+        fmt_str_lengths=100,
+        tbl_rows=-1,
+        tbl_cell_alignment="LEFT",
+        set_fmt_float="full",
+        set_tbl_width_chars=80,
+    ):
+        return str(df)
+
+
+def test_render_table(sample_df):
+    table = _Table(sample_df, "all", dist=True)
+    table.form_stat_df("all")
+    for stat_df in table.stat_dfs.values():
+        assert render_table(stat_df) == render_with_config(stat_df)
+
+    # Wrapped at spaces, long words are split
+    df = pl.DataFrame(
+        {
+            "a": ["1501-01-20 14:37:46", "x"],
+            "b": ["foo bar baz " * 5, "y" * 60],
+            "c": [None, "z"],
+        }
+    )
+    rendered = render_table(df)
+    assert max(len(line) for line in rendered.splitlines()) <= 80
+    assert render_table(df.fill_null("")) == render_with_config(df.fill_null(""))
+    assert render_table(pl.DataFrame({"a": [1.234, None]})) == " a    \n 1.23 \n      "
+
+
+def test_render_without_config(sample_df, monkeypatch, capsys):
+    table = _Table(sample_df, "all")
+    table.form_stat_df("all")
+    expected = {k: render_table(v) for k, v in table.stat_dfs.items()}
+    monkeypatch.setattr(pl, "Config", None)  # Rendering must not touch it
+    table.show()
+    assert capsys.readouterr().out.count("-Numerical columns") == 1
+
+    with ThreadPoolExecutor(8) as pool:
+        results = pool.map(
+            lambda item: (item[0], render_table(item[1])),
+            list(table.stat_dfs.items()) * 20,
+        )
+        for table_type, rendered in results:
+            assert rendered == expected[table_type]
+
+
+def test_render_wide_characters():
+    # Aligned by display width: CJK and fullwidth characters take two cells
+    df = pl.DataFrame(
+        {"a": ["日本語テキスト", "x"], "b": ["ｆｕｌｌ", "y"], "c": ["中文", ""]}
+    )
+    assert render_table(df) == render_with_config(df)
+    df = pl.DataFrame({"a": ["日本語テキスト", "x"], "b": ["é", "y"]})
+    assert (
+        render_table(df)
+        == " a               b \n 日本語テキスト  é \n x               y "
+    )
+    # Wrapped lines stay within max_width cells
+    df = pl.DataFrame({"a": ["日本語テキスト" * 8, "x"], "b": ["中文 " * 30, "y"]})
+    lines = render_table(df).splitlines()
+    assert {_get_width(line) for line in lines} == {_get_width(lines[0])}
+    assert _get_width(lines[0]) <= 80
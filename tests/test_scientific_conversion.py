@@ -1,5 +1,5 @@
 import polars as pl
-from showstats._utils import convert_df_scientific
+from showstats._utils import convert_df_scientific, format_scientific
 
 
 def test_convert_df_scientific():
@@ -46,3 +46,15 @@ def test_convert_df_scientific_custom_threshold():
     result = convert_df_scientific(df, ["values"], thr=3).collect()
 
     assert result["values"].to_list() == ["0.1", "10.0", "1000.0", "1.0E4", "1.0E5"]
+
+
+def test_format_scientific():
+    values = [0.125, 0.375, 99999.995, -1e-9, 1e6, 1e9, -0.005, 5e-324, 1.8e308]
+    values += [10.0**e for e in range(-20, 20)]
+    values += [x / 1000 for x in range(-20_000, 20_000, 7)]
+    values += [x * 1e3 + 500 for x in range(-5_000, 5_000, 13)]
+    df = pl.DataFrame({"values": values + [None, float("nan"), float("inf")]})
+    for thr in (4, 3):
+        expected = convert_df_scientific(df.lazy(), ["values"], thr=thr).collect()
+        result = [format_scientific(value, thr) for value in df["values"]]
+        assert result == expected["values"].to_list()
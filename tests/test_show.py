@@ -1,6 +1,6 @@
 import polars as pl
 import pytest
-from showstats.showstats import show_stats
+from showstats.showstats import show_stats, show_stats_compare
 
 
 def test_show(sample_df, capsys):
@@ -68,3 +68,26 @@ def test_edge_cases():
     # Test with a DataFrame containing all null values
     df_all_null = pl.DataFrame({"a": [None] * 100, "b": [None] * 100})
     show_stats(df_all_null)
+
+
+def test_show_stats_dry_run(sample_df, capsys):
+    show_stats(sample_df, dry_run=True)
+    out = capsys.readouterr().out
+    assert out.startswith("-Classification")
+    assert sample_df.stats.explain() == out.rstrip("\n")
+
+
+def test_show_stats_compare(sample_df, capsys):
+    show_stats_compare({"train": sample_df.head(300), "test": sample_df.tail(200)})
+    captured = capsys.readouterr()
+    assert "-Numerical columns" in captured.out
+    assert "-Categorical columns" in captured.out
+    assert "-Date and datetime columns" in captured.out
+    assert "N=300/200" in captured.out
+    assert "ΔAvg" in captured.out
+    assert "float_mean_2" in captured.out
+    show_stats_compare(
+        {"a": sample_df.select("int_col"), "b": sample_df.select("int_col")}, "cat"
+    )
+    captured = capsys.readouterr()
+    assert "No categorical columns found" in captured.out
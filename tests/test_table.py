@@ -1,6 +1,20 @@
+import re
+import time
+
 import polars as pl
+import polars.selectors as cs
+import pytest
+import showstats
+import showstats._table as _table
 from polars.testing import assert_frame_equal
-from showstats._table import _Table
+from showstats._stats_cache import _StatsCache, clear_stats_cache, stats_cache_info
+from showstats._table import (
+    _get_lazy_schema,
+    _make_plan,
+    _sample_rows,
+    _Table,
+    plan_cache_info,
+)
 
 
 def test_make_dt_num(sample_df):
@@ -182,3 +196,434 @@ def test_pandas(sample_df):
     _table_polars.form_stat_df("num")
 
     assert_frame_equal(_table_pandas.stat_dfs["num"], _table_polars.stat_dfs["num"])
+
+
+def test_dist(sample_df):
+    from showstats._utils import make_sparkline
+
+    table = _Table(sample_df, "all", dist=True)
+    table.form_stat_df("all")
+    assert table.stat_dfs["num"].columns[-1] == "Dist"
+    assert table.stat_dfs["time"].columns[-1] == "Dist"
+    assert "Dist" not in table.stat_dfs["cat"].columns
+    var_0 = pl.col(table.stat_dfs["num"].columns[0])
+    dist_int = table.stat_dfs["num"].filter(var_0 == "int_col").item(0, "Dist")
+    assert dist_int == "████████"  # Uniform
+    assert table.stat_dfs["num"].filter(var_0 == "null_col").item(0, "Dist") == ""
+    assert table.stat_dfs["time"].get_column("Dist").str.len_chars().max() == 8
+
+    table_no_dist = _Table(sample_df, "num")
+    table_no_dist.form_stat_df("num")
+    assert_frame_equal(
+        table_no_dist.stat_dfs["num"], table.stat_dfs["num"].drop("Dist")
+    )
+
+    assert make_sparkline([], 4) == ""
+    assert make_sparkline([{"bin": 0, "count": 8}, {"bin": 3, "count": 1}], 4) == "█  ▁"
+
+
+def test_numpy_backend(sample_df):
+    df = sample_df.with_columns(
+        pl.col("float_col").cast(pl.Float32).alias("float32_col"),
+        pl.when(pl.col("int_col") == 3)
+        .then(float("nan"))
+        .otherwise(pl.col("U"))
+        .alias("nan_col"),
+    )
+    table_polars = _Table(df, "num", backend="polars")
+    table_polars.form_stat_df("num")
+    table_numpy = _Table(df, "num", backend="numpy")
+    table_numpy.form_stat_df("num")
+    assert_frame_equal(table_polars.stat_dfs["num"], table_numpy.stat_dfs["num"])
+
+    wide = pl.DataFrame({f"x_{i}": [float(i), 2.0 * i, 3.0] for i in range(100)})
+    table_wide_polars = _Table(wide, "num", backend="polars")
+    table_wide_polars.form_stat_df("num")
+    table_wide_auto = _Table(wide, "num")
+    table_wide_auto.form_stat_df("num")
+    assert_frame_equal(
+        table_wide_polars.stat_dfs["num"], table_wide_auto.stat_dfs["num"]
+    )
+
+
+def test_path_and_lazy_input(sample_df, tmp_path):
+    table = _Table(sample_df, "all")
+    table.form_stat_df("all")
+
+    sample_df.write_ipc(tmp_path / "df.arrow")
+    sample_df.write_parquet(tmp_path / "df.parquet")
+    inputs = [sample_df.lazy(), tmp_path / "df.arrow", str(tmp_path / "df.parquet")]
+    for df in inputs:
+        table_lazy = _Table(df, "all")
+        table_lazy.form_stat_df("all")
+        assert table_lazy.num_rows == sample_df.height
+        for table_type in ("num", "cat", "time"):
+            assert_frame_equal(
+                table.stat_dfs[table_type], table_lazy.stat_dfs[table_type]
+            )
+
+    sample_df.select("float_mean_2", "int_col").write_csv(tmp_path / "df.csv")
+    table_csv = _Table(tmp_path / "df.csv", "num")
+    table_csv.form_stat_df("num")
+    assert table_csv.stat_dfs["num"].columns[0] == "Var. N=500"
+    assert table_csv.stat_dfs["num"].height == 2
+
+    with pytest.raises(ValueError):
+        _Table(sample_df.lazy().head(0), "num")
+    with pytest.raises(ValueError):
+        _Table(tmp_path / "df.xlsx", "num")
+
+
+def test_approx_and_sample(sample_df):
+    table = _Table(sample_df, "all", approx=True, sample=100)
+    table.form_stat_df("all")
+    assert table.num_rows == 100
+    assert table.stat_dfs["num"].columns[0] == "Var. N=100"
+    var_0 = pl.col(table.stat_dfs["cat"].columns[0])
+    assert table.stat_dfs["cat"].filter(var_0 == "enum_col").item(0, "Uniques") == 3
+
+    table_lazy = _Table(sample_df.lazy(), "num", sample=100)
+    assert table_lazy.num_rows == 100
+    assert _Table(sample_df, "num", sample=10_000).num_rows == sample_df.height
+    lazy_sample = _sample_rows(sample_df.lazy(), 100)
+    assert "shuffle" not in lazy_sample.explain()  # No permutation of all rows
+    sample_rows = lazy_sample.collect()
+    assert sample_rows.columns == sample_df.columns
+    assert sample_rows.get_column("int_col").n_unique() == 100
+    n_rows = _Table(sample_df.lazy(), "num", sample=10_000).num_rows
+    assert n_rows == sample_df.height
+    with pytest.raises(ValueError):
+        _Table(sample_df, "num", sample=0)
+
+
+def test_time_budget(sample_df):
+    table = _Table(sample_df, "all")
+    table.form_stat_df("all")
+
+    table_exact = _Table(sample_df, "all", time_budget_ms=60_000)
+    table_exact.form_stat_df("all")
+    for table_type in ("num", "cat", "time"):
+        stat_df = table_exact.stat_dfs[table_type]
+        assert stat_df.get_column("Prec.").unique().to_list() == ["exact"]
+        assert_frame_equal(table.stat_dfs[table_type], stat_df.drop("Prec."))
+
+    table_meta = _Table(sample_df, "all", time_budget_ms=0)
+    table_meta.form_stat_df("all")
+    stat_df = table_meta.stat_dfs["num"]
+    assert stat_df.get_column("Prec.").unique().sort().to_list() == ["exact", "meta"]
+    assert stat_df.get_column("NA%").equals(table.stat_dfs["num"].get_column("NA%"))
+    assert stat_df.filter(pl.col("Prec.") == "meta").get_column("Avg").unique()[0] == ""
+
+    big_df = pl.concat([sample_df] * 30)
+    table_lazy = _Table(big_df.lazy(), "num", time_budget_ms=0)
+    assert table_lazy.num_rows == big_df.height
+    table_sample = _Table(big_df, "num", time_budget_ms=60_000)
+    assert set(table_sample.precision.values()) == {"exact"}
+
+
+def test_time_budget_sample_stage(monkeypatch):
+    # Aggregating costs 1 ms per variable and 1,000 rows on a fake clock, so a
+    # budget of 100 ms covers the sample stage but not the exact stage
+    clock = [0.0]
+    evaluate = _Table._evaluate
+
+    def evaluate_with_cost(self, df, variables):
+        height = self.num_rows if isinstance(df, pl.LazyFrame) else df.height
+        clock[0] += len(variables) * height / 1e6
+        return evaluate(self, df, variables)
+
+    monkeypatch.setattr(_table.time, "perf_counter", lambda: clock[0])
+    monkeypatch.setattr(_Table, "_evaluate", evaluate_with_cost)
+    n = 100_000
+    df = pl.DataFrame(
+        {
+            "x": pl.Series([1.0, None] * (n // 2)),
+            "i": pl.arange(n, eager=True),
+            "s": pl.Series([{"a": 1}, {"a": None}] * (n // 2)),
+        }
+    )
+    for input_df in (df, df.lazy()):
+        table = _Table(input_df, "num", time_budget_ms=100)
+        table.form_stat_df("num")
+        stat_df = table.stat_dfs["num"]
+        assert stat_df.get_column("Prec.").unique().to_list() == ["sample"]
+        na_share = dict(zip(stat_df.get_column(stat_df.columns[0]), stat_df["NA%"]))
+        assert 45 <= na_share["x"] <= 55
+        assert 45 <= na_share["s.a"] <= 55
+        # A random sample, not the first rows
+        assert table.stats["i____max"] > 50_000
+
+
+def test_time_budget_lazy(tmp_path):
+    n = 1_000_000
+    path = tmp_path / "df.parquet"
+    pl.select(
+        *(pl.int_range(n).mul(i).alias(f"x_{i}") for i in range(16)),
+        pl.int_range(n).cast(pl.String).alias("s"),
+    ).write_parquet(path)
+    for input_df in (path, pl.scan_parquet(path)):
+        start = time.perf_counter()
+        table = _Table(input_df, "all", time_budget_ms=50)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        assert elapsed_ms <= 50 + 100  # Slack for the last batch and the setup
+        assert table.num_rows == n
+    # The meta stage takes the null counts from the footer of the Parquet file
+    pytest.importorskip("pyarrow")
+    table = _Table(path, "num", time_budget_ms=0)
+    assert table.stats["x_1____null_count"] == 0
+    assert table.precision["x_1____null_count"] == "exact"
+
+
+def test_duckdb_relation(sample_df):
+    duckdb = pytest.importorskip("duckdb")
+    df = sample_df.drop("null_col")  # Arrives in duckdb as an INTEGER column
+    rel = duckdb.from_arrow(df.to_arrow())
+
+    table = _Table(df, "all")
+    table.form_stat_df("all")
+    table_duckdb = _Table(rel, "all")
+    table_duckdb.form_stat_df("all")
+    assert table_duckdb.num_rows == df.height
+    for table_type in ("num", "cat", "time"):
+        assert_frame_equal(
+            table.stat_dfs[table_type], table_duckdb.stat_dfs[table_type]
+        )
+
+    table_sample = _Table(rel, "cat", approx=True, sample=100)
+    assert table_sample.num_rows == 100
+    with pytest.raises(ValueError):
+        _Table(rel, "num", dist=True)
+
+
+def test_nested_columns():
+    df = pl.DataFrame(
+        {
+            "payload": [
+                {"user": {"age": 30, "name": "a"}},
+                {"user": {"age": None, "name": "b"}},
+                {"user": {"age": 50, "name": "b"}},
+            ],
+            "tags": [["x", "y"], [], None],
+            "scores": [[1.0, None], [3.0], [5.0, 6.0]],
+        }
+    )
+    for input_df in (df, df.lazy()):
+        table = _Table(input_df, "all")
+        assert table.vars_map["num_int"] == [
+            "payload.user.age",
+            "len(tags)",
+            "len(scores)",
+        ]
+        assert table.vars_map["num_float"] == ["scores[]"]
+        assert table.vars_map["cat"] == ["payload.user.name", "tags[]"]
+        stats = table.stats
+        assert stats["payload.user.age____mean"] == 40.0
+        assert stats["payload.user.age____null_count"] == 1
+        assert stats["len(tags)____null_count"] == 1
+        assert stats["len(tags)____max"] == 2
+        assert stats["tags[]____null_count"] == 0
+        assert stats["tags[]____n_unique"] == 2
+        assert stats["scores[]____null_count"] == 1
+        assert stats["scores[]____max"] == 6.0
+
+        table.form_stat_df("all")
+        stat_df = table.stat_dfs["num"].filter(pl.col("Var. N=3") == "scores[]")
+        assert stat_df.get_column("NA%").item() == 20  # 1 of 5 elements
+        stat_df = table.stat_dfs["cat"].filter(pl.col("Var. N=3") == "tags[]")
+        assert stat_df.get_column("Top 1").item() == "x (50%)"
+
+
+def test_keys():
+    df = pl.DataFrame(
+        {
+            "user_id": [1, 1, 2, 2, 2, 2, 3, None, None, None],
+            "ts": ["a", "a", "b", "b", "b", "b", "c", None, None, None],
+        }
+    )
+    for input_df in (df, df.lazy()):
+        table = _Table(input_df, "all", keys=["user_id", "ts"])
+        table.form_stat_df("all")
+        key_df = table.stat_dfs["keys"]
+        assert key_df.columns == [
+            "Keys N=10",
+            "Distinct",
+            "Dup.%",
+            "Top 1",
+            "Top 2",
+            "Top 3",
+        ]
+        assert key_df.row(0) == (
+            "user_id, ts",
+            "4",
+            "60",
+            "(2, b) (4x)",
+            "(null, null) (3x)",
+            "(1, a) (2x)",
+        )
+
+    table = _Table(df.with_row_index(), "num", keys="index")
+    table.form_stat_df("num")
+    assert table.stat_dfs["keys"].row(0) == ("index", "10", "0")
+    assert "keys" not in _Table(df, "num").stat_dfs
+    # The meta stage of anytime mode takes the null counts of data frames
+    for input_df in (df, df.lazy()):
+        table = _Table(input_df, "all", keys="user_id", time_budget_ms=60_000)
+        table.form_stat_df("all")
+        assert table.stat_dfs["keys"].row(0)[:3] == ("user_id", "4", "60")
+        assert table.stat_dfs["keys"].get_column("Prec.").to_list() == ["exact"]
+    with pytest.raises(ValueError):
+        _Table(df, "num", keys=[])
+
+
+def test_columns_and_filter(sample_df, tmp_path):
+    path = tmp_path / "df.parquet"
+    sample_df.write_parquet(path)
+    expected = _Table(sample_df.filter(pl.col("int_col") < 50).select("U"), "num")
+    for input_df in (sample_df, sample_df.lazy(), path):
+        table = _Table(input_df, "num", columns="U", filter=pl.col("int_col") < 50)
+        assert table.vars_map == {"num_float": ["U"]}
+        assert table.stats == expected.stats
+
+    table = _Table(sample_df, "all", columns=["^float_.*$", cs.string()])
+    assert table.vars_map["cat"] == ["str_col"]
+    assert all(var.startswith("float_") for var in table.vars_map["num_float"])
+    table = _Table(sample_df, "all", columns="U", keys="int_col")
+    assert table.vars_map == {"num_float": ["U"], "num_int": ["int_col"]}
+    with pytest.raises(ValueError):
+        _Table(sample_df, "all", columns="^nothing_.*$")
+
+
+def test_lazy_schema_older_polars(sample_df):
+    class OldLazyFrame:  # LazyFrame.collect_schema was added in polars 1.0
+        schema = sample_df.schema
+
+    assert _get_lazy_schema(OldLazyFrame()) == dict(sample_df.schema)
+    assert _get_lazy_schema(sample_df.lazy()) == dict(sample_df.schema)
+
+
+def test_dry_run(sample_df):
+    table = _Table(sample_df, "all", keys="int_col", dry_run=True)
+    assert not hasattr(table, "stats")
+    report = table.explain()
+    assert " num_float (7): " in report
+    assert f"{sum(len(v) for v in table.exprs_map.values())} expressions" in report
+    assert re.search(r"\n cat +3 +9 +n_unique, value_counts ", report)
+    assert "-Optimized plan" in report
+    report_approx = _Table(sample_df.lazy(), "cat", approx=True, dry_run=True).explain()
+    assert re.search(r"\n cat +3 +9 +value_counts ", report_approx)
+    with pytest.raises(ValueError):
+        _Table(sample_df, "all").explain()
+
+
+def test_deferred(sample_df):
+    for df in (sample_df, sample_df.lazy()):
+        table = _Table(df, "all", keys="int_col", evaluate=False)
+        assert not hasattr(table, "stats")
+        table.set_stats(table.make_query().collect())
+        expected = _Table(df, "all", keys="int_col", backend="polars")
+        assert table.stats == expected.stats
+        assert table.num_rows == expected.num_rows
+    with pytest.raises(ValueError):
+        _Table(sample_df, "all", dry_run=True).make_query()
+    with pytest.raises(ValueError):
+        _Table(sample_df, "all", cache=True, evaluate=False)
+
+
+def test_plan_cache(sample_df):
+    assert showstats.plan_cache_info is plan_cache_info  # Public
+    _make_plan.cache_clear()
+    table = _Table(sample_df, "all", top_cols="U")
+    info = plan_cache_info()
+    assert (info.hits, info.misses) == (0, 1)
+    # Same schema, new data: the classification and expressions are reused
+    other = _Table(sample_df.tail(100), "all", top_cols=["U"])
+    assert plan_cache_info().hits == 1
+    assert other.exprs_map is table.exprs_map
+    assert other.stats["U____null_count"] == sample_df.tail(100)["U"].null_count()
+    again = _Table(sample_df, "all", top_cols="U")
+    again.form_stat_df("num")
+    table.form_stat_df("num")
+    assert_frame_equal(again.stat_dfs["num"], table.stat_dfs["num"])
+    assert again.stat_dfs["num"]["Var. N=500"][0] == "U"
+    # Other dtypes or options are planned separately
+    _Table(sample_df.with_columns(pl.col("U").cast(pl.Float32)), "all", top_cols="U")
+    _Table(sample_df, "all", top_cols="U", approx=True)
+    _Table(sample_df, "num")
+    info = plan_cache_info()
+    assert (info.hits, info.misses) == (2, 4)
+
+
+def test_stats_cache(sample_df):
+    assert showstats.clear_stats_cache is clear_stats_cache  # Public
+    assert showstats.stats_cache_info is stats_cache_info
+    clear_stats_cache()
+    df = sample_df.with_columns(x=pl.Series([1.0, float("nan")] * 250))
+    _Table(df, "all", cache=True)
+    n_cached = stats_cache_info().currsize
+    assert stats_cache_info().misses == n_cached
+    # Only the modified and the new column are aggregated again. fill_nan keeps
+    # the values buffer but has a new validity buffer.
+    df = df.with_columns(pl.col("x").fill_nan(None), y=pl.col("U") * 2)
+    table = _Table(df, "all", cache=True)
+    info = stats_cache_info()
+    assert (info.hits, info.misses) == (n_cached - 1, n_cached + 2)
+    assert table.stats == _Table(df, "all").stats
+    assert table.stats["x____null_count"] == 250
+    # Strings longer than 12 bytes are not inlined into their views
+    clear_stats_cache()
+    df = pl.DataFrame({"s": ["a long string value", None] * 5})
+    _Table(df, "cat", cache=True)
+    _Table(df, "cat", cache=True)
+    info = stats_cache_info()
+    assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+    # Least recently used entries are evicted
+    cache = _StatsCache(maxsize=2)
+    for i in range(3):
+        cache.put((i,), pl.Series([i]), {"a": i})
+    assert cache.get((0,)) is None and cache.get((2,)) == {"a": 2}
+    assert cache.info().currsize == 2
+    clear_stats_cache()
+    assert stats_cache_info().currsize == 0
+
+
+def test_str_len():
+    df = pl.DataFrame(
+        {
+            "s": ["a", "", None, "abcd", "é"],
+            "c": pl.Series(["x", "yy", "x", None, None], dtype=pl.Categorical),
+            "x": [1, 2, 3, 4, 5],
+        }
+    )
+    table = _Table(df, "cat", str_len=True)
+    assert table.stats["str_len____s"] == {
+        "min": 0,
+        "mean": 1.75,
+        "max": 4,
+        "n_empty": 1,
+        "n": 4,
+        "bytes": 7,
+    }
+    table.form_stat_df("cat")
+    res = table.stat_dfs["cat"]
+    assert res.columns[:6] == ["Var. N=5", "NA%", "Uniques", "Len", "Empty%", "Bytes"]
+    assert res.row(0)[3:6] == ("0/1.8/4", "25", "7 B")
+    assert res.row(1)[3:6] == ("1/1.3/2", "0", "4 B")
+    table = _Table(df, "cat")
+    table.form_stat_df("cat")
+    assert "Len" not in table.stat_dfs["cat"].columns
+
+
+def test_fast_path(sample_df):
+    df = sample_df.with_columns(
+        dec=pl.col("int_col").cast(pl.Decimal(10, 2)),
+        big=pl.col("U") * 1e9,
+        tiny=pl.col("U") * 1e-9,
+    )
+    table = _Table(df, "all", top_cols=["big", "enum_col"], str_len=True)
+    assert table.fast_path
+    slow = _Table(df, "all", top_cols=["big", "enum_col"], str_len=True)
+    slow.fast_path = False
+    for table_type in ("num", "cat", "time"):
+        table.form_stat_df(table_type)
+        slow.form_stat_df(table_type)
+        assert_frame_equal(table.stat_dfs[table_type], slow.stat_dfs[table_type])